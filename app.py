@@ -1,9 +1,12 @@
-import os, tempfile
+import time
 import streamlit as st
-from config import OPENAI_API_KEY
-from resume_generator import generate_resume_content
-from pdf_utils import create_pdf
-from ui_components import resume_form
+from config import OPENAI_API_KEY, WARMUP_MODELS, start_warmup
+from exporters import FORMATS, export_resume
+from metrics import metrics, profile_request, start_metrics_server
+from prompt_templates import format_user_details
+from resume_parser import ResumeParser, section_title
+from session_store import SessionResult, SessionResultStore, input_fingerprint
+from ui_components import EXPORT_FORMAT_LABELS, resume_form
 
 st.set_page_config(page_title="AI Resume Builder", page_icon="📄", layout="wide")
 st.title("🤖 AI Resume Builder")
@@ -17,38 +20,121 @@ col1, col2 = st.columns([1, 1])
 
 with col1:
     st.subheader("📝 Your Information")
-    name, email, phone, education, experience, skills, job_field, submitted = resume_form()
+    with metrics.span("form"):
+        name, email, phone, education, experience, skills, job_field, export_formats, submitted = resume_form()
+
+# Minimum seconds between preview repaints while tokens are streaming in
+PREVIEW_REFRESH_SECONDS = 0.1
+
+store = SessionResultStore()
+
+
+def generate(user_details, job_field, key):
+    """Stream a new resume into the preview; returns a SessionResult or None."""
+    with st.spinner("🔄 Generating your resume..."), profile_request(), metrics.span("request"):
+        # Imported here so LangChain/FAISS load after the first paint
+        from resume_generator import stream_resume_content
+        preview = st.empty()
+        progress = st.empty()
+        stats = {}
+        chunks = []
+        # Parse while streaming so the export step doesn't re-parse the text
+        parser = ResumeParser()
+        last_paint = 0.0
+        for chunk in stream_resume_content(user_details, job_field, stats):
+            chunks.append(chunk)
+            if parser.feed(chunk):
+                done = ", ".join(section_title(k) for k in parser.completed_sections())
+                progress.caption(f"✍️ Sections ready: {done}")
+            now = time.perf_counter()
+            if now - last_paint >= PREVIEW_REFRESH_SECONDS:
+                preview.text("".join(chunks))
+                last_paint = now
+        parser.close()
+        progress.empty()
+        preview.empty()
+    content = "".join(chunks)
+    if not stats.get("ok") or not content:
+        return None
+    return store.put(SessionResult(key, name, job_field, user_details, content, parser.result(), stats))
+
+
+def show_result(entry, formats, fresh):
+    """Draw a finished resume; only formats not exported in this session yet are rendered."""
+    stats = entry.stats
+    if not fresh:
+        st.caption("♻️ Restored from this session")
+    elif stats["cached"]:
+        st.caption(f"⚡ Served from cache in {stats['total'] * 1000:.0f} ms")
+    elif stats["coalesced"]:
+        st.caption(f"🔗 Shared an identical in-flight generation ({stats['total']:.2f}s)")
+    else:
+        st.caption(f"⏱ First token after {stats.get('ttft', stats['total']):.2f}s · "
+                   f"generated in {stats['total']:.2f}s · "
+                   f"{stats.get('input_tokens')} input / {stats.get('output_tokens')} output tokens")
+    st.text_area("", entry.content, height=400, disabled=True)
+
+    # Every missing format renders concurrently from the one parse
+    missing = [fmt for fmt in formats if fmt not in entry.exports]
+    if missing:
+        entry.exports.update(export_resume(entry.content, missing, entry.parsed))
+        store.evict()
+    exports = {fmt: entry.exports[fmt] for fmt in formats if fmt in entry.exports}
+    for fmt, data in exports.items():
+        _, mime, ext = FORMATS[fmt]
+        st.download_button(f"📥 Download Resume {EXPORT_FORMAT_LABELS[fmt]}", data,
+                           f"{entry.name.replace(' ', '_')}_resume.{ext}",
+                           mime, use_container_width=True, key=f"download_{fmt}")
+    if not exports:
+        st.error("❌ Resume export failed.")
+
+    with st.expander("✏️ Rewrite one section"):
+        keys = [k for k, _ in entry.parsed.iter_sections() if k != "NOTE"]
+        section = st.selectbox("Section", keys, format_func=section_title, key="rewrite_section")
+        instructions = st.text_input("Instructions (optional)", key="rewrite_instructions",
+                                     placeholder="e.g. more quantified achievements")
+        if section and st.button("Rewrite section", key="rewrite_button"):
+            from resume_generator import regenerate_section
+            with st.spinner(f"🔄 Rewriting {section_title(section)}..."):
+                result = regenerate_section(entry.content, section, entry.job_field, instructions or None,
+                                            entry.user_details, entry.parsed)
+            if result is not None:
+                content, parsed, changed = result
+                if changed:
+                    entry.replace_content(content, parsed)
+                    st.rerun()
+                st.info("The rewritten section is identical; nothing to update.")
+
 
 with col2:
     st.subheader("📄 Resume Preview")
+    formats = export_formats or ["pdf"]
     if submitted:
         if not all([name, email, phone, education, experience, skills]):
             st.error("❌ Please fill in all required fields.")
         else:
-            user_details = f"""
-            Name: {name}
-            Email: {email}
-            Phone: {phone}
-            Education: {education}
-            Experience: {experience}
-            Skills: {skills}
-            """
-            with st.spinner("🔄 Generating your resume..."):
-                resume_content = generate_resume_content(user_details, job_field)
-                if resume_content:
-                    st.success("✅ Resume generated successfully!")
-                    st.text_area("", resume_content, height=400, disabled=True)
-                    
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                        pdf_filename = tmp_file.name
-                    
-                    if create_pdf(resume_content, pdf_filename):
-                        with open(pdf_filename, "rb") as file:
-                            st.download_button("📥 Download Resume PDF", file.read(),
-                                               f"{name.replace(' ', '_')}_resume.pdf",
-                                               "application/pdf", use_container_width=True)
-                        os.unlink(pdf_filename)
-                    else:
-                        st.error("❌ PDF creation failed.")
+            user_details = format_user_details(name, email, phone, education, experience, skills)
+            key = input_fingerprint(user_details, job_field)
+            entry = store.get(key)
+            fresh = entry is None
+            if fresh:
+                metrics.inc("cache_requests_total", cache="session", result="miss")
+                entry = generate(user_details, job_field, key)
+            else:
+                # Same inputs as a result already in this session: no LLM call, no re-render
+                metrics.inc("cache_requests_total", cache="session", result="hit")
+                store.current = entry
+            if entry is not None:
+                st.success("✅ Resume generated successfully!")
+                show_result(entry, formats, fresh)
+    elif store.current is not None:
+        # Any other rerun (download click, widget change) redraws the last result
+        show_result(store.current, formats, fresh=False)
     else:
         st.info("👆 Fill in details and click 'Generate Resume'.")
+
+if WARMUP_MODELS:
+    start_warmup()
+
+# Prometheus text on http://localhost:$METRICS_PORT/metrics (off unless set)
+start_metrics_server()
@@ -0,0 +1,175 @@
+"""
+Headless batch resume generation.
+
+    python batch.py candidates.csv --out-dir out/ [--concurrency 8] [--render-workers 4]
+
+Rows are streamed from a CSV or JSONL file with the form's fields:
+name, email, phone, education, experience, skills, job_field (and an
+optional id column; the row number is used otherwise). Each row goes
+through the same prompt, retrieval and cache as the app, via
+llm.ainvoke with at most --concurrency calls in flight. PDFs are rendered
+on a RenderPool of pre-warmed worker processes as results arrive.
+
+Progress is appended to OUT_DIR/results.jsonl as each row finishes. Re-run
+the same command after a crash and rows already recorded as "ok" are
+skipped. Per-stage latencies for the run are written to OUT_DIR/metrics.prom.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+from metrics import metrics
+from render_pool import RenderPool
+
+REQUIRED_FIELDS = ("name", "email", "phone", "education", "experience", "skills", "job_field")
+RESULTS_FILE = "results.jsonl"
+METRICS_FILE = "metrics.prom"
+
+
+def _jsonl_rows(f):
+    """(line number, row dict or ValueError) for each non-blank JSONL line."""
+    for number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"expected a JSON object, got {type(row).__name__}")
+        except ValueError as e:  # includes JSONDecodeError
+            row = ValueError(f"line {number}: {e}")
+        yield number, row
+
+
+def iter_rows(path):
+    """
+    Yield (row_id, row dict) from a .csv or .jsonl file without loading it
+    all. A JSONL line that is not a JSON object yields (line number,
+    ValueError) instead, so it is recorded as a failed row.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = _jsonl_rows(f)
+        else:
+            rows = enumerate(csv.DictReader(f), start=1)
+        for number, row in rows:
+            if isinstance(row, Exception):
+                yield str(number), row
+                continue
+            # JSONL values may be numbers or null; everything downstream expects text
+            row = {key: "" if value is None else str(value) for key, value in row.items()}
+            yield row.get("id") or str(number), row
+
+
+def load_checkpoint(out_dir):
+    """Row ids already completed successfully in a previous run."""
+    done = set()
+    path = os.path.join(out_dir, RESULTS_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash
+                if record.get("status") == "ok":
+                    done.add(record["id"])
+    return done
+
+
+def safe_filename(row_id):
+    return re.sub(r"[^\w.-]+", "_", row_id)
+
+
+async def process_row(row_id, row, out_dir, semaphore, render_pool):
+    from prompt_templates import format_user_details
+    from resume_generator import agenerate_resume_content
+
+    if isinstance(row, Exception):
+        return {"id": row_id, "status": "error", "error": str(row)}
+    missing = [field for field in REQUIRED_FIELDS if not str(row.get(field) or "").strip()]
+    if missing:
+        return {"id": row_id, "status": "error", "error": f"missing fields: {', '.join(missing)}"}
+
+    start = time.perf_counter()
+    user_details = format_user_details(*(row[field] for field in REQUIRED_FIELDS[:-1]))
+    try:
+        async with semaphore:
+            resume_content = await agenerate_resume_content(user_details, row["job_field"], raise_errors=True)
+        stem = os.path.join(out_dir, safe_filename(row_id))
+        with open(stem + ".txt", "w", encoding="utf-8") as f:
+            f.write(resume_content)
+        with metrics.span("pdf_render", where="pool"):
+            pdf_bytes = await asyncio.wrap_future(render_pool.submit(resume_content))
+        with open(stem + ".pdf", "wb") as f:
+            f.write(pdf_bytes)
+    except Exception as e:
+        metrics.inc("errors_total", stage="batch_row")
+        return {"id": row_id, "status": "error", "error": str(e)}
+    seconds = time.perf_counter() - start
+    metrics.observe("batch_row", seconds)
+    return {"id": row_id, "status": "ok", "pdf": stem + ".pdf", "seconds": round(seconds, 3)}
+
+
+async def run_batch(input_path, out_dir, concurrency=8, render_workers=None):
+    os.makedirs(out_dir, exist_ok=True)
+    done = load_checkpoint(out_dir)
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+
+    with RenderPool(render_workers) as render_pool, \
+            open(os.path.join(out_dir, RESULTS_FILE), "a", encoding="utf-8") as results:
+        pending = set()
+
+        async def drain(return_when):
+            nonlocal pending
+            finished, pending = await asyncio.wait(pending, return_when=return_when)
+            for task in finished:
+                try:
+                    record = task.result()
+                except Exception as e:
+                    # one bad row must not abort the batch
+                    metrics.inc("errors_total", stage="batch_row")
+                    record = {"id": task.get_name(), "status": "error", "error": f"{type(e).__name__}: {e}"}
+                counts[record["status"]] += 1
+                results.write(json.dumps(record, ensure_ascii=False) + "\n")
+                results.flush()
+
+        for row_id, row in iter_rows(input_path):
+            if row_id in done:
+                counts["skipped"] += 1
+                continue
+            pending.add(asyncio.create_task(process_row(row_id, row, out_dir, semaphore, render_pool), name=row_id))
+            # Bound read-ahead so huge inputs aren't all scheduled at once
+            if len(pending) >= concurrency * 2:
+                await drain(asyncio.FIRST_COMPLETED)
+        if pending:
+            await drain(asyncio.ALL_COMPLETED)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV or JSONL file of candidates")
+    parser.add_argument("--out-dir", default="batch_output")
+    parser.add_argument("--concurrency", type=int, default=8, help="max LLM calls in flight")
+    parser.add_argument("--render-workers", type=int, default=None, help="PDF render processes (default: CPU count)")
+    parser.add_argument("--verbose", action="store_true", help="log per-request token counts")
+    args = parser.parse_args()
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    counts = asyncio.run(run_batch(args.input, args.out_dir, args.concurrency, args.render_workers))
+    # Per-stage latency summary for the run, in Prometheus text format
+    metrics.dump(os.path.join(args.out_dir, METRICS_FILE))
+    print(", ".join(f"{k}: {v}" for k, v in counts.items()))
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
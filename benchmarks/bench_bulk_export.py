@@ -0,0 +1,101 @@
+"""
+Peak memory and throughput of bulk ZIP export (bulk_export.iter_zip)
+as the batch grows, against rendering every PDF into a list and zipping
+it into memory afterwards.
+
+Each (mode, size) runs in a fresh subprocess so its peak RSS (ru_maxrss)
+is not inflated by earlier runs. Modes:
+  - eager:  all PDFs rendered to a list, then zipped into a BytesIO
+  - stream: iter_zip() in-process, chunks written to a temp file
+  - pool:   iter_zip() on a RenderPool (--workers), same output; the
+            reported RSS is the parent's, workers are bounded by the window
+
+Run from the repo root:  python -m benchmarks.bench_bulk_export --sizes 100 400 1600 [--scale 8]
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+from benchmarks.corpus import sample_corpus
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def iter_resumes(n, scale=1):
+    # Generated lazily, like reading rows from disk, so the input is not part of the footprint
+    for i in range(n):
+        head, body = sample_corpus(1, seed=i)[0].split("\n", 1)
+        # scale > 1 repeats everything after the name: longer, multi-page resumes
+        yield f"{head} {i}", head + "\n" + body * scale
+
+
+def run_child(mode, n, workers, scale):
+    from bulk_export import _render_inline, iter_zip
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    _render_inline(sample_corpus(1)[0])  # ReportLab imports and fonts, outside the measurement
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "eager":
+        pdfs = [(name, _render_inline(text)) for name, text in iter_resumes(n, scale)]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, pdf in pdfs:
+                archive.writestr(f"{name}.pdf", pdf)
+        size = buffer.tell()
+    else:
+        pool = None
+        if mode == "pool":
+            from render_pool import RenderPool
+            pool = RenderPool(workers)
+            start = time.perf_counter()
+        stats = {}
+        with tempfile.TemporaryFile() as f:
+            for chunk in iter_zip(iter_resumes(n, scale), pool, stats=stats):
+                f.write(chunk)
+            size = stats["bytes"]
+        if pool is not None:
+            pool.shutdown()
+    seconds = time.perf_counter() - start
+    print(json.dumps({"seconds": seconds, "zip_mb": size / 2 ** 20,
+                      "base_mb": base, "peak_mb": peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 400, 1600])
+    parser.add_argument("--modes", nargs="+", default=["eager", "stream", "pool"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--scale", type=int, default=1, help="repeat each resume body N times (bigger PDFs)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "N"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.workers, args.scale)
+        return
+
+    print(f"{'mode':<8} {'resumes':>8} {'seconds':>8} {'PDF/s':>7} {'zip MB':>7} {'peak RSS MB':>12} {'growth MB':>10}")
+    for mode in args.modes:
+        for n in args.sizes:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_bulk_export", "--child", mode, str(n),
+                 "--workers", str(args.workers), "--scale", str(args.scale)],
+                capture_output=True, text=True, check=True, cwd=os.getcwd(),
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:<8} {n:>8} {r['seconds']:>8.2f} {n / r['seconds']:>7.1f} {r['zip_mb']:>7.1f} "
+                  f"{r['peak_mb']:>12.1f} {r['peak_mb'] - r['base_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
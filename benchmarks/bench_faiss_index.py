@@ -0,0 +1,94 @@
+"""
+Recall@k vs. latency/memory for the FAISS index types in vectorstore.py.
+
+Builds each configuration over a synthetic clustered corpus (MiniLM's 384
+dimensions by default), measures single-query latency and recall@k against
+exact search, and reports serialized index size as the memory footprint.
+
+Run from the repo root:
+  python -m benchmarks.bench_faiss_index --sizes 10000 100000
+  python -m benchmarks.bench_faiss_index --sizes 1000000 --queries 200
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from vectorstore import build_faiss_index, configure_search
+
+CONFIGS = [
+    ("flat", dict(index_type="flat", pq_m=0)),
+    ("ivf", dict(index_type="ivf", pq_m=0)),
+    ("ivf+pq", dict(index_type="ivf", pq_m=48)),
+    ("hnsw", dict(index_type="hnsw", pq_m=0)),
+    ("hnsw+pq", dict(index_type="hnsw", pq_m=48)),
+]
+
+
+def synthetic_corpus(n, dim, n_queries, seed=0):
+    """Gaussian clusters, roughly mimicking topic structure in sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    n_clusters = max(8, n // 500)
+    centers = rng.normal(size=(n_clusters, dim)).astype("float32")
+    labels = rng.integers(0, n_clusters, size=n + n_queries)
+    data = centers[labels] + 0.35 * rng.normal(size=(n + n_queries, dim)).astype("float32")
+    faiss.normalize_L2(data)
+    return data[:n], data[n:]
+
+
+def recall_at_k(found, truth, k):
+    hits = sum(len(set(f[:k]) & set(t[:k])) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--configs", nargs="+", default=[label for label, _ in CONFIGS],
+                        choices=[label for label, _ in CONFIGS])
+    args = parser.parse_args()
+
+    build_threads = faiss.omp_get_max_threads()
+    print(f"{'n':>8} {'index':<10} {'param':<12} {'build s':>8} {'query ms':>9} "
+          f"{'recall@' + str(args.k):>9} {'size MB':>8}")
+    for n in args.sizes:
+        data, queries = synthetic_corpus(n, args.dim, args.queries)
+        exact = faiss.IndexFlatL2(args.dim)
+        exact.add(data)
+        _, truth = exact.search(queries, args.k)
+
+        for label, options in CONFIGS:
+            if label not in args.configs:
+                continue
+            faiss.omp_set_num_threads(build_threads)
+            start = time.perf_counter()
+            index = build_faiss_index(data, **options)
+            build_s = time.perf_counter() - start
+            size_mb = faiss.serialize_index(index).nbytes / 1e6
+
+            if "ivf" in label:
+                sweep = [(f"nprobe={p}", dict(nprobe=p)) for p in args.nprobe]
+            elif "hnsw" in label:
+                sweep = [(f"efSearch={e}", dict(ef_search=e)) for e in args.ef_search]
+            else:
+                sweep = [("-", {})]
+            faiss.omp_set_num_threads(1)  # per-query latency, as in a single Streamlit request
+            for param, search_options in sweep:
+                configure_search(index, **search_options)
+                found = []
+                start = time.perf_counter()
+                for q in queries:
+                    found.append(index.search(q[None, :], args.k)[1][0])
+                query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+                print(f"{n:>8} {label:<10} {param:<12} {build_s:>8.2f} {query_ms:>9.3f} "
+                      f"{recall_at_k(found, truth, args.k):>9.3f} {size_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
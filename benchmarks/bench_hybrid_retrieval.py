@@ -0,0 +1,116 @@
+"""
+Template retrieval quality and latency: the old
+vectorstore.as_retriever(search_type="similarity") path vs. the
+HybridRetriever in retrieval.py (lexical-only, hybrid and auto modes).
+
+A synthetic library of templates for --fields job fields (each with its
+own vocabulary, e.g. DevOps: Kubernetes, Terraform, on-call) is indexed
+with FakeEmbeddings, whose query cost is set with --embed-latency to
+stand in for a MiniLM forward pass on CPU. Queries are role names and
+variants ("senior devops engineer", "actuarial analyst"); a hit is the
+template of the intended field at rank 1.
+
+Run from the repo root:  python -m benchmarks.bench_hybrid_retrieval --embed-latency 0.01
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.fakes import FakeEmbeddings
+from retrieval import HybridRetriever
+from vectorstore import build_vectorstore
+
+FIELD_VOCAB = {
+    "DevOps": ["kubernetes", "terraform", "ci/cd pipelines", "on-call rotation", "helm", "prometheus"],
+    "Actuary": ["actuarial models", "mortality tables", "reserving", "pricing", "ifrs 17", "soa exams"],
+    "Data Science": ["machine learning", "python", "a/b testing", "feature engineering", "statistics"],
+    "Software Engineering": ["microservices", "java", "rest apis", "code review", "system design"],
+    "Marketing": ["campaigns", "seo", "brand strategy", "content marketing", "conversion rate"],
+    "Finance": ["financial modeling", "valuation", "budgeting", "forecasting", "excel"],
+    "Nursing": ["patient care", "triage", "medication administration", "icu", "charting"],
+    "Teaching": ["lesson planning", "curriculum", "classroom management", "student assessment"],
+    "Accounting": ["general ledger", "reconciliations", "gaap", "month-end close", "audit"],
+    "Cybersecurity": ["siem", "incident response", "penetration testing", "threat modeling", "soc"],
+    "UX Design": ["user research", "wireframes", "figma", "usability testing", "prototyping"],
+    "Sales": ["pipeline management", "quota attainment", "crm", "prospecting", "negotiation"],
+}
+ALIASES = {
+    "DevOps": ["devops engineer", "senior devops", "site reliability devops"],
+    "Actuary": ["actuary", "actuarial analyst", "associate actuary"],
+    "Data Science": ["data scientist", "senior data science", "machine learning data science"],
+    "Software Engineering": ["software engineer", "backend software engineering"],
+    "Marketing": ["marketing manager", "digital marketing"],
+    "Finance": ["finance analyst", "corporate finance"],
+    "Nursing": ["registered nurse nursing", "icu nursing"],
+    "Teaching": ["high school teaching", "teaching assistant"],
+    "Accounting": ["staff accounting", "accounting specialist"],
+    "Cybersecurity": ["cybersecurity analyst", "soc cybersecurity"],
+    "UX Design": ["ux designer", "product ux design"],
+    "Sales": ["account executive sales", "inside sales"],
+}
+SHARED = ["led cross-functional teams", "improved efficiency by 20%", "communication skills",
+          "bachelor degree", "stakeholder management", "delivered projects on time"]
+
+
+def build_library(per_field, seed=0):
+    rnd = random.Random(seed)
+    texts, metadatas = [], []
+    for field, vocab in FIELD_VOCAB.items():
+        for v in range(per_field):
+            lines = [f"PROFESSIONAL SUMMARY", f"{field} professional with {rnd.randint(2, 12)} years of experience.",
+                     "EXPERIENCE"]
+            lines += [f"• {rnd.choice(vocab)} and {rnd.choice(SHARED)}" for _ in range(6)]
+            lines += ["SKILLS", ", ".join(rnd.sample(vocab, 3) + rnd.sample(SHARED, 2))]
+            texts.append("\n".join(lines))
+            metadatas.append({"job_field": field, "variant": str(v)})
+    return texts, metadatas
+
+
+def timed(fn, queries):
+    latencies, hits = [], 0
+    for query, field in queries:
+        start = time.perf_counter()
+        doc = fn(query)
+        latencies.append(time.perf_counter() - start)
+        hits += doc is not None and doc.metadata.get("job_field") == field
+    return hits / len(queries), statistics.median(latencies), sorted(latencies)[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-field", type=int, default=25, help="templates per job field")
+    parser.add_argument("--embed-latency", type=float, default=0.01, help="seconds per query embedding")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    embeddings = FakeEmbeddings()
+    texts, metadatas = build_library(args.per_field)
+    store = build_vectorstore(list(zip(texts, embeddings.embed_documents(texts))), embeddings, metadatas=metadatas)
+    embeddings.latency = args.embed_latency
+    queries = [(alias, field) for field, aliases in ALIASES.items() for alias in aliases] * args.repeat
+
+    start = time.perf_counter()
+    hybrid = HybridRetriever(store, embeddings)
+    build_ms = (time.perf_counter() - start) * 1000
+    baseline = store.as_retriever(search_type="similarity", search_kwargs={"k": 1})
+
+    def first(results):
+        return results[0][0] if results else None
+
+    paths = {
+        "as_retriever(similarity)": lambda q: next(iter(baseline.invoke(f"Resume template for {q}")), None),
+        "hybrid lexical": lambda q: first(hybrid.search(f"Resume template for {q}", k=1, mode="lexical")),
+        "hybrid fused": lambda q: first(hybrid.search(f"Resume template for {q}", k=1, mode="hybrid")),
+        "hybrid auto": lambda q: first(hybrid.search(f"Resume template for {q}", k=1, mode="auto")),
+    }
+    print(f"{len(texts)} templates, {len(FIELD_VOCAB)} fields, {len(queries)} queries, "
+          f"BM25 index built in {build_ms:.1f} ms, embed latency {args.embed_latency * 1000:.0f} ms")
+    print(f"{'path':<26} {'recall@1':>8} {'p50':>11} {'p95':>11}")
+    for name, fn in paths.items():
+        recall, p50, p95 = timed(fn, queries)
+        print(f"{name:<26} {recall:8.2f} {p50 * 1e6:9.0f}us {p95 * 1e6:9.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Load time and memory: pickle-based FAISS.load_local vs. the mmap format
+in index_store.py.
+
+A synthetic store (random vectors, short template texts) is written in
+both formats, then each loader runs in a fresh interpreter and reports:
+  - load time
+  - RSS growth after load + a few queries
+  - anonymous (private, non-shareable) memory growth; file-backed mmap
+    pages are shared through the page cache by all processes on the host
+
+Run from the repo root:  python -m benchmarks.bench_index_load --docs 200000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_LOADER = """
+import json, sys, time
+import numpy as np
+
+def memory():
+    fields = {{}}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] in ("Rss:", "Anonymous:"):
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+    except OSError:
+        import resource
+        fields["Rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return fields
+
+from langchain_community.vectorstores import FAISS
+from index_store import load_index
+
+class Dummy:
+    def embed_query(self, text):
+        raise RuntimeError("not used")
+
+before = memory()
+start = time.perf_counter()
+if "{mode}" == "pickle":
+    store = FAISS.load_local("{folder}", Dummy(), allow_dangerous_deserialization=True)
+else:
+    store = load_index("{folder}", Dummy())
+load_s = time.perf_counter() - start
+rng = np.random.default_rng(1)
+for _ in range(20):
+    store.similarity_search_by_vector(rng.random({dim}, dtype="float32").tolist(), k=3)
+after = memory()
+print(json.dumps({{"load_s": load_s,
+                   "rss": after.get("Rss", 0) - before.get("Rss", 0),
+                   "anon": after.get("Anonymous", 0) - before.get("Anonymous", 0)}}))
+"""
+
+
+def build_store(n_docs, dim, folder):
+    import numpy as np
+    from langchain_community.vectorstores import FAISS
+    from index_store import save_index
+    from benchmarks.corpus import sample_resume
+
+    rng = np.random.default_rng(0)
+    vectors = rng.random((n_docs, dim), dtype="float32")
+    texts = [sample_resume(i % 1000) for i in range(n_docs)]
+    metadatas = [{"job_field": f"Field {i % 50}", "source": f"templates/{i}.txt"} for i in range(n_docs)]
+    store = FAISS.from_embeddings(list(zip(texts, vectors.tolist())), None, metadatas=metadatas)
+    store.save_local(os.path.join(folder, "pickle"))
+    save_index(store, os.path.join(folder, "mmap"))
+
+
+def run_loader(mode, folder, dim):
+    code = _LOADER.format(mode=mode, folder=folder, dim=dim)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        build_store(args.docs, args.dim, folder)
+        print(f"{args.docs} documents, dim {args.dim}")
+        print(f"{'format':<8} {'load ms':>9} {'RSS MB':>8} {'anon MB':>8}")
+        for mode in ("pickle", "mmap"):
+            runs = [run_loader(mode, os.path.join(folder, mode), args.dim) for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["load_s"])
+            print(f"{mode:<8} {best['load_s'] * 1000:>9.1f} {best['rss'] / 1e6:>8.1f} {best['anon'] / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+LLM request shaping against FakeChatModel: a provider that allows only
+--provider-concurrency calls in flight (extra calls get a 429), fails a
+further --error-rate of calls with 429, and makes --slow-rate of calls
+take --slow-latency seconds.
+
+Compares calling the model directly with ScheduledChatModel (token
+bucket, retries, hedging, AIMD concurrency) at the same client
+concurrency.
+
+Run from the repo root:  python -m benchmarks.bench_llm_scheduler --requests 200
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeChatModel
+from llm_scheduler import ScheduledChatModel
+
+
+def run(model, requests, concurrency):
+    latencies, failures = [], 0
+
+    def call(i):
+        start = time.perf_counter()
+        try:
+            model.invoke(f"request {i}")
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for latency in pool.map(call, range(requests)):
+            if latency is None:
+                failures += 1
+            else:
+                latencies.append(latency)
+    return time.perf_counter() - start, latencies, failures
+
+
+def report(label, wall, latencies, failures, requests):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else float("nan")
+    p50 = statistics.median(latencies) if latencies else float("nan")
+    print(f"{label:<10} ok {requests - failures:4d}/{requests}  wall {wall:6.2f}s  "
+          f"p50 {p50:5.2f}s  p95 {p95:5.2f}s  max {max(latencies, default=float('nan')):5.2f}s")
+
+
+def fake(args):
+    return FakeChatModel(latency=args.latency, latency_jitter=args.latency / 2, slow_rate=args.slow_rate,
+                         slow_latency=args.slow_latency, rate_limit_rate=args.error_rate,
+                         max_concurrency=args.provider_concurrency, seed=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--provider-concurrency", type=int, default=6)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    parser.add_argument("--hedge-after", type=float, default=1.0)
+    parser.add_argument("--rpm", type=int, default=6000)
+    args = parser.parse_args()
+
+    model = fake(args)
+    wall, latencies, failures = run(model, args.requests, args.concurrency)
+    report("direct", wall, latencies, failures, args.requests)
+    print(f"{'':<10} provider 429s {model.rate_limited}")
+
+    model = fake(args)
+    scheduled = ScheduledChatModel(model, requests_per_minute=args.rpm, tokens_per_minute=10 ** 9,
+                                   backoff_base=0.1, backoff_max=2.0, max_retries=6,
+                                   hedge_after=args.hedge_after, initial_concurrency=args.concurrency,
+                                   max_concurrency=args.concurrency)
+    wall, latencies, failures = run(scheduled, args.requests, args.concurrency)
+    report("scheduled", wall, latencies, failures, args.requests)
+    print(f"{'':<10} provider 429s {model.rate_limited}  {scheduled.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Resume x job-description matching at scale (matching.ResumeMatcher) with
+FakeEmbeddings, so the numbers isolate everything except the model's
+forward pass:
+  - cold run: embed every unique text and fill the on-disk cache
+  - warm run: all embeddings read back from the cache
+  - scoring alone: the blocked NumPy similarity/reduce passes
+  - a per-pair Python loop over the same vectors, timed on a subset and
+    extrapolated
+
+Run from the repo root:  python -m benchmarks.bench_matching --resumes 2000 --jds 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.corpus import OBJECTS, SKILLS, VERBS, sample_corpus
+from benchmarks.fakes import FakeEmbeddings
+from embedding_cache import EmbeddingCache
+from matching import JobDescription, ResumeMatcher
+
+
+def sample_jds(n, seed=0):
+    rnd = random.Random(seed)
+    jds = []
+    for i in range(n):
+        lines = [f"Job {i}", "Requirements:"]
+        lines += [f"• {rnd.choice(VERBS)} {rnd.choice(OBJECTS)}" for _ in range(rnd.randint(5, 12))]
+        lines.append(f"Skills: {', '.join(rnd.sample(SKILLS, 5))}")
+        jds.append(JobDescription.from_text(f"jd-{i}", "\n".join(lines)))
+    return jds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--jds", type=int, default=200)
+    parser.add_argument("--loop-sample", type=int, default=20, help="resumes timed with the per-pair loop")
+    args = parser.parse_args()
+
+    resumes = sample_corpus(args.resumes)
+    jds = sample_jds(args.jds)
+    rows = sum(len(jd.requirements) for jd in jds)
+    print(f"{args.resumes} resumes x {args.jds} JDs ({rows} requirement rows)")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cache = EmbeddingCache(os.path.join(workdir, "embeddings.sqlite3"))
+        for label in ("cold", "warm"):
+            matcher = ResumeMatcher(FakeEmbeddings(), cache)
+            start = time.perf_counter()
+            results = matcher.match(resumes, jds, top_k=5)
+            print(f"{label:<6} match() {time.perf_counter() - start:7.2f}s  cache {cache.stats()}")
+
+        units, unit_counts, req_vectors, req_counts = matcher._prepare(resumes, jds)
+        start = time.perf_counter()
+        for _ in matcher._iter_blocks(units, unit_counts, req_vectors, req_counts):
+            pass
+        vectorized = time.perf_counter() - start
+        print(f"scoring only (NumPy, blocked) {vectorized * 1000:9.1f} ms")
+
+        unit_offsets = np.concatenate(([0], np.cumsum(unit_counts)))
+        req_offsets = np.concatenate(([0], np.cumsum(req_counts)))
+        sample = min(args.loop_sample, args.resumes)
+        start = time.perf_counter()
+        for r in range(sample):
+            resume = units[unit_offsets[r]:unit_offsets[r + 1]]
+            for j in range(len(jds)):
+                total = 0.0
+                for q in range(req_offsets[j], req_offsets[j + 1]):
+                    total += max(float(u @ req_vectors[q]) for u in resume)
+        loop = (time.perf_counter() - start) * args.resumes / sample
+        print(f"scoring only (per-pair loop, extrapolated from {sample} resumes) {loop:9.1f} s "
+              f"-> {loop / vectorized:.0f}x slower")
+        print(f"example: {results[0][0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark: renders/sec of the PDF layout engine.
+
+  before: a fresh ResumeRenderer per resume with the regex cache purged,
+          i.e. the per-call setup create_pdf used to do
+  after:  one shared ResumeRenderer (what create_pdf uses now)
+
+Run from the repo root:  python -m benchmarks.bench_pdf_render
+"""
+import argparse
+import io
+import re
+import time
+
+from benchmarks.corpus import sample_corpus
+from pdf_utils import ResumeRenderer
+
+
+def _run(corpus, rounds, shared):
+    renderer = ResumeRenderer() if shared else None
+    count = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            if not shared:
+                re.purge()
+                renderer = ResumeRenderer()
+            renderer.render(text, io.BytesIO())
+            count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = sample_corpus(args.resumes)
+    ResumeRenderer().render(corpus[0], io.BytesIO())  # warm imports/fonts
+
+    before = _run(corpus, args.rounds, shared=False)
+    after = _run(corpus, args.rounds, shared=True)
+    print(f"corpus: {len(corpus)} resumes x {args.rounds} rounds")
+    print(f"before (per-call setup): {before:8.1f} renders/sec")
+    print(f"after  (shared renderer): {after:8.1f} renders/sec")
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
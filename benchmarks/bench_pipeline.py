@@ -0,0 +1,220 @@
+"""
+Offline end-to-end load test: N concurrent sessions each run
+generate_resume_content -> create_pdf for --requests resumes, against
+FakeChatModel (configurable latency and output size) and FakeEmbeddings.
+
+Reports throughput, end-to-end and per-stage latency percentiles (from
+metrics.py spans) and peak memory per stage (a separate single-session
+pass under tracemalloc), and writes everything as JSON so runs can be
+compared between commits:
+
+    python -m benchmarks.bench_pipeline --sessions 8 --requests 20 --out before.json
+    ... change something ...
+    python -m benchmarks.bench_pipeline --sessions 8 --requests 20 --compare before.json
+
+The FAISS index and generation cache live in a temporary directory, so
+the run needs no API key or network and leaves the working tree alone.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import FIELDS, FIRST, LAST, SKILLS
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]  # noqa: E731
+    return {"mean": statistics.fmean(values), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99),
+            "max": values[-1]}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def setup_offline(args, workdir):
+    """Point the app at temp storage and swap in the fake models before anything imports config."""
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    os.environ["FAISS_INDEX_DIR"] = os.path.join(workdir, "faiss_index")
+    os.environ["GENERATION_CACHE_PATH"] = os.path.join(workdir, "generation_cache.sqlite3")
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    import config
+    from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+    from llm_scheduler import ScheduledChatModel
+
+    fake = FakeChatModel(latency=args.latency, latency_jitter=args.latency_jitter,
+                         tokens_per_second=args.tokens_per_second, output_chars=args.output_chars)
+    config._llm = fake if args.no_scheduler else ScheduledChatModel(
+        fake, requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9,
+        initial_concurrency=args.sessions, max_concurrency=args.sessions)
+    config._embeddings = FakeEmbeddings()
+
+
+def user_details(session, i):
+    from prompt_templates import format_user_details
+    first, last = FIRST[session % len(FIRST)], LAST[i % len(LAST)]
+    return format_user_details(
+        f"{first} {last} {session}-{i}", f"{first.lower()}.{session}.{i}@email.com", "+1 555 010 0000",
+        "BSc Computer Science", f"{i % 12} years", ", ".join(SKILLS[i % 5:i % 5 + 4]),
+    )
+
+
+def run_load(sessions, requests):
+    from metrics import metrics
+    from pdf_utils import create_pdf
+    from resume_generator import generate_resume_content
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def session(s):
+        for i in range(requests):
+            start = time.perf_counter()
+            text = generate_resume_content(user_details(s, i), FIELDS[(s + i) % len(FIELDS)])
+            ok = text is not None and create_pdf(text, io.BytesIO())
+            with lock:
+                (latencies if ok else errors).append(time.perf_counter() - start)
+
+    metrics.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    wall = time.perf_counter() - start
+    snapshot = metrics.snapshot()
+    return {
+        "wall_s": wall,
+        "completed": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": len(latencies) / wall,
+        "latency_s": percentiles(latencies),
+        "stages": snapshot["stages"],
+        "counters": snapshot["counters"],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def stage_memory(samples):
+    """Peak Python heap growth (tracemalloc) per stage, one request at a time."""
+    from pdf_utils import create_pdf
+    from resume_generator import _build_prompt, generate_resume_content
+    from resume_parser import parse_resume
+
+    peaks = {"prompt_build": [], "generate": [], "parse": [], "pdf": []}
+    tracemalloc.start()
+    try:
+        for i in range(samples):
+            details, field = user_details(10_000, i), FIELDS[i % len(FIELDS)]
+            stages = [
+                ("prompt_build", lambda: _build_prompt(details, field)),
+                ("generate", lambda: generate_resume_content(details, field)),
+            ]
+            for name, fn in stages:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                result = fn()
+                peaks[name].append(tracemalloc.get_traced_memory()[1] - base)
+            text = result
+            for name, fn in (("parse", lambda: parse_resume(text)), ("pdf", lambda: create_pdf(text, io.BytesIO()))):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                fn()
+                peaks[name].append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return {name: {"peak_kb_max": max(v) / 1024, "peak_kb_mean": statistics.fmean(v) / 1024}
+            for name, v in peaks.items()}
+
+
+def compare(current, previous):
+    print(f"\nvs {previous.get('git_revision')} ({previous.get('timestamp')}):")
+    rows = [("throughput_rps", current["load"]["throughput_rps"], previous["load"]["throughput_rps"])]
+    for q in ("p50", "p95", "p99"):
+        rows.append((f"latency {q}", current["load"]["latency_s"].get(q), previous["load"]["latency_s"].get(q)))
+    for stage, stats in current["load"]["stages"].items():
+        old = previous["load"]["stages"].get(stage)
+        if old:
+            rows.append((f"{stage} p95", stats["p95"], old["p95"]))
+    for name, cur, old in rows:
+        if cur is None or not old:
+            continue
+        print(f"  {name:<28} {old:10.4f} -> {cur:10.4f}  ({(cur - old) / old * 100:+6.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions (threads)")
+    parser.add_argument("--requests", type=int, default=10, help="requests per session")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM seconds to first token")
+    parser.add_argument("--latency-jitter", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="fake decode speed (0 = instant)")
+    parser.add_argument("--output-chars", type=int, default=2500, help="fake resume size")
+    parser.add_argument("--no-scheduler", action="store_true", help="call the fake model without llm_scheduler")
+    parser.add_argument("--memory-samples", type=int, default=5)
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--compare", default=None, help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_offline(args, workdir)
+        # First request builds the index, retriever and PDF renderer; keep it out of the numbers
+        from resume_generator import generate_resume_content
+        generate_resume_content(user_details(-1, 0), FIELDS[0])
+
+        load = run_load(args.sessions, args.requests)
+        memory = stage_memory(args.memory_samples)
+
+    results = {
+        "benchmark": "pipeline",
+        "git_revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": vars(args),
+        "load": load,
+        "stage_memory": memory,
+    }
+
+    print(f"{args.sessions} sessions x {args.requests} requests: {load['completed']} ok, {load['errors']} errors "
+          f"in {load['wall_s']:.2f}s -> {load['throughput_rps']:.2f} resumes/s, peak RSS {load['peak_rss_mb']:.0f} MB")
+    lat = load["latency_s"]
+    if lat:
+        print(f"{'end-to-end':<15} p50 {lat['p50'] * 1000:9.2f} ms  p95 {lat['p95'] * 1000:9.2f} ms  "
+              f"p99 {lat['p99'] * 1000:9.2f} ms")
+    for stage, stats in sorted(load["stages"].items()):
+        print(f"{stage:<15} p50 {stats['p50'] * 1000:9.2f} ms  p95 {stats['p95'] * 1000:9.2f} ms  "
+              f"p99 {stats['p99'] * 1000:9.2f} ms  (n={stats['count']})")
+    for stage, stats in memory.items():
+        print(f"{stage:<15} peak heap {stats['peak_kb_max']:8.1f} KB (mean {stats['peak_kb_mean']:.1f} KB)")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nwrote {args.out}")
+    return 1 if load["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
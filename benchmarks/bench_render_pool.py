@@ -0,0 +1,48 @@
+"""
+Throughput of the off-thread PDF RenderPool at 1/2/4/8 workers, against
+rendering in-process on one thread.
+
+Workers are spawned and warmed before timing starts. Inputs are sent as
+text by default; --parsed sends ParsedResume objects (parsed in the parent).
+
+Run from the repo root:  python -m benchmarks.bench_render_pool --resumes 400
+"""
+import argparse
+import io
+import time
+
+from benchmarks.corpus import sample_corpus
+from pdf_utils import get_renderer
+from render_pool import RenderPool
+from resume_parser import parse_resume
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--parsed", action="store_true", help="submit ParsedResume instead of text")
+    args = parser.parse_args()
+
+    corpus = sample_corpus(args.resumes)
+    if args.parsed:
+        corpus = [parse_resume(text) for text in corpus]
+
+    renderer = get_renderer()
+    start = time.perf_counter()
+    for resume in corpus:
+        renderer.render_parsed(parse_resume(resume) if isinstance(resume, str) else resume, io.BytesIO())
+    baseline = len(corpus) / (time.perf_counter() - start)
+    print(f"{len(corpus)} resumes ({'parsed' if args.parsed else 'text'} input)")
+    print(f"{'in-process':<12} {baseline:8.1f} renders/sec")
+
+    for workers in args.workers:
+        with RenderPool(workers) as pool:
+            start = time.perf_counter()
+            total = sum(len(pdf) for pdf in pool.map(corpus, chunksize=4))
+            rate = len(corpus) / (time.perf_counter() - start)
+        print(f"{workers:>2} workers   {rate:8.1f} renders/sec  ({rate / baseline:.2f}x, {total / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
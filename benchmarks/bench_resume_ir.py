@@ -0,0 +1,80 @@
+"""
+Memory and serialization benchmark for the parsed resume IR.
+
+Compares the slotted ParsedResume/Section/Entry model against the old
+dict-of-dicts layout (every section, even empty ones, with four lists) on
+N synthetic resumes, then times JSON, marshal and pickle round-trips.
+Memory is what stays allocated after parsing all N texts into each
+layout (strings included).
+
+Run from the repo root:  python -m benchmarks.bench_resume_ir --resumes 100000
+"""
+import argparse
+import gc
+import json
+import pickle
+import time
+import tracemalloc
+
+from benchmarks.corpus import sample_resume
+from resume_parser import CANON_ORDER, ParsedResume, parse_resume
+
+
+def legacy_layout(parsed):
+    """The pre-IR structure: dict per section with paras/lines/bullets/entries lists."""
+    sections = {k: {"paras": [], "lines": [], "bullets": [], "entries": []} for k in CANON_ORDER}
+    for key, sec in parsed.iter_sections():
+        sections[key]["paras"].extend(sec.paras)
+        sections[key]["lines"].extend(sec.lines)
+        sections[key]["bullets"].extend(sec.bullets)
+        sections[key]["entries"].extend({"header": e.header, "bullets": list(e.bullets)} for e in sec.entries)
+    return parsed.name, list(parsed.contacts), sections
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objects, current
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    out = [fn(item) for item in items]
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.resumes
+
+    texts = [sample_resume(i % 5000) for i in range(n)]
+    start = time.perf_counter()
+    compact, compact_bytes = measure(lambda: [parse_resume(t) for t in texts])
+    print(f"{n} resumes parsed in {time.perf_counter() - start:.2f}s (with tracemalloc on)")
+    legacy, legacy_bytes = measure(lambda: [legacy_layout(parse_resume(t)) for t in texts])
+    print(f"\nmemory                 total MB   bytes/resume")
+    print(f"  legacy dict-of-dicts {legacy_bytes / 1e6:9.1f} {legacy_bytes / n:12.0f}")
+    print(f"  slotted IR           {compact_bytes / 1e6:9.1f} {compact_bytes / n:12.0f}")
+    del legacy
+
+    print(f"\nserialization          size B   encode µs   decode µs")
+    codecs = [
+        ("json", ParsedResume.to_json, ParsedResume.from_json),
+        ("marshal", ParsedResume.to_bytes, ParsedResume.from_bytes),
+        ("pickle", pickle.dumps, pickle.loads),
+        ("legacy json", lambda p: json.dumps(legacy_layout(p)), json.loads),
+    ]
+    for label, encode, decode in codecs:
+        blobs, encode_s = timed(encode, compact)
+        _, decode_s = timed(decode, blobs)
+        size = sum(len(b) for b in blobs) / n
+        print(f"  {label:<18} {size:8.0f} {encode_s * 1e6 / n:11.2f} {decode_s * 1e6 / n:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
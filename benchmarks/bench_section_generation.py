@@ -0,0 +1,62 @@
+"""
+Wall-clock latency and token cost of single-shot generation vs. the
+"sections" mode of resume_generator (one concurrent call per section,
+all sharing STATIC_PREFIX), against FakeChatModel decoding at
+--tokens-per-second after --latency seconds to first token.
+
+Token counts are the prompt_builder counts for what would be sent and
+received (tiktoken when installed); the fake model only simulates time.
+
+Run from the repo root:  python -m benchmarks.bench_section_generation --resumes 10
+"""
+import argparse
+import statistics
+import tempfile
+
+from benchmarks.bench_pipeline import setup_offline, user_details
+from benchmarks.corpus import FIELDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds to first token per call")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="decode speed per call")
+    parser.add_argument("--output-chars", type=int, default=3000, help="resume size (~4 chars/token)")
+    args = parser.parse_args()
+    args.no_scheduler, args.sessions = False, 8
+
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_offline(args, workdir)
+        from resume_generator import stream_resume_content
+        # warm up index, retriever and tokenizer
+        list(stream_resume_content(user_details(-1, 0), FIELDS[0], {}, mode="single"))
+
+        results = {}
+        for mode in ("single", "sections"):
+            walls, ttfts, inputs, outputs = [], [], [], []
+            for i in range(args.resumes):
+                stats = {}
+                text = "".join(stream_resume_content(user_details(i, 7), FIELDS[i % len(FIELDS)], stats, mode=mode))
+                if not stats.get("ok"):
+                    raise SystemExit(f"{mode} generation failed")
+                walls.append(stats["total"])
+                ttfts.append(stats["ttft"])
+                inputs.append(stats["input_tokens"])
+                outputs.append(stats["output_tokens"])
+            results[mode] = (walls, ttfts, inputs, outputs, len(text))
+
+    print(f"{args.resumes} resumes, {args.latency}s to first token, {args.tokens_per_second:g} tokens/s per call")
+    print(f"{'mode':<10} {'wall p50':>9} {'wall max':>9} {'first text':>11} {'input tok':>10} {'output tok':>11}")
+    for mode, (walls, ttfts, inputs, outputs, _) in results.items():
+        print(f"{mode:<10} {statistics.median(walls):8.2f}s {max(walls):8.2f}s {statistics.median(ttfts):10.2f}s "
+              f"{statistics.fmean(inputs):10.0f} {statistics.fmean(outputs):11.0f}")
+    single, sections = results["single"], results["sections"]
+    print(f"sections vs single: wall {statistics.median(sections[0]) / statistics.median(single[0]):.2f}x, "
+          f"input tokens {statistics.fmean(sections[2]) / statistics.fmean(single[2]):.1f}x, "
+          f"output tokens {statistics.fmean(sections[3]) / statistics.fmean(single[3]):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Startup benchmark for app.py's dependency chain.
+
+Each measurement runs in a fresh interpreter so nothing is pre-imported:
+  - import time of each app module (and the slowest individual imports,
+    from `python -X importtime`)
+  - time to first render: one full run of app.py through Streamlit's
+    AppTest harness, i.e. what a new replica pays before the page paints
+
+Run from the repo root:  python -m benchmarks.bench_startup
+A dummy OPENAI_API_KEY is used when none is set; no request is made.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+MODULES = ["config", "ui_components", "pdf_utils", "resume_generator", "app_imports"]
+
+_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+{stmt}
+print(time.perf_counter() - start)
+"""
+
+_FIRST_RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=600)
+at.run()
+print(time.perf_counter() - start)
+"""
+
+
+def _python(code, *flags):
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark-dummy")
+    result = subprocess.run([sys.executable, *flags, "-c", code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return result
+
+
+def app_imports(path="app.py"):
+    """Top-level modules app.py imports at module level, read from its source."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_seconds(module):
+    if module == "app_imports":
+        # The module-level imports app.py performs before the first paint
+        stmt = "import " + ", ".join(app_imports())
+    else:
+        stmt = f"import {module}"
+    return float(_python(_IMPORT_SNIPPET.format(stmt=stmt)).stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module, top):
+    """Root packages (no dot in the name) with the largest cumulative import time."""
+    stderr = _python(f"import {module}", "-X", "importtime").stderr
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not cumulative_us.isdigit() or "." in name:
+            continue
+        totals[name] = max(totals.get(name, 0), int(cumulative_us))
+    return sorted(((us, name) for name, us in totals.items()), reverse=True)[:top]
+
+
+def first_render_seconds():
+    return float(_python(_FIRST_RENDER_SNIPPET).stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is reported)")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    print("import time (best of %d, fresh interpreter each):" % args.repeat)
+    for module in MODULES:
+        try:
+            best = min(import_seconds(module) for _ in range(args.repeat))
+        except RuntimeError as e:
+            print(f"  {module:<18} failed: {e}")
+            continue
+        print(f"  {module:<18} {best * 1000:9.1f} ms")
+
+    print("\nslowest packages imported by resume_generator:")
+    for cumulative_us, name in slowest_imports("resume_generator", args.top):
+        print(f"  {name:<32} {cumulative_us / 1000:9.1f} ms")
+
+    best = min(first_render_seconds() for _ in range(args.repeat))
+    print(f"\ntime to first render (app.py via AppTest): {best * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Deterministic sample resume texts shared by the benchmark scripts."""
+import random
+
+FIELDS = ["Software Engineering", "Data Science", "Marketing", "Finance"]
+FIRST = ["Jane", "John", "Priya", "Carlos", "Mei", "Ahmed", "Olga", "Kwame"]
+LAST = ["Doe", "Smith", "Patel", "Garcia", "Chen", "Khan", "Ivanova", "Mensah"]
+ROLES = ["Software Engineer", "Data Analyst", "Marketing Manager", "Financial Analyst",
+         "Backend Developer", "ML Engineer", "Product Analyst"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+VERBS = ["Built", "Led", "Designed", "Optimized", "Automated", "Delivered", "Analyzed"]
+OBJECTS = ["data pipelines", "REST APIs", "marketing campaigns", "financial models",
+           "dashboards", "CI/CD workflows", "customer segmentation models"]
+SKILLS = ["Python", "SQL", "Java", "Docker", "AWS", "Tableau", "Excel", "React", "Spark", "Git"]
+
+
+def sample_resume(seed):
+    """Return one plausible resume text in the format prompt_templates asks for."""
+    rnd = random.Random(seed)
+    first, last = rnd.choice(FIRST), rnd.choice(LAST)
+    lines = [
+        f"{first} {last}",
+        "",
+        "EMAIL",
+        f"{first.lower()}.{last.lower()}@email.com",
+        "",
+        "PHONE",
+        f"+1 (555) {rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}",
+        "",
+        "LINKEDIN",
+        f"linkedin.com/in/{first.lower()}{last.lower()}",
+        "",
+        "PROFESSIONAL SUMMARY",
+        f"Results-driven {rnd.choice(ROLES)} with {rnd.randint(2, 12)}+ years of experience "
+        f"in {rnd.choice(OBJECTS)} and a proven track record of measurable impact.",
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2024
+    for _ in range(rnd.randint(2, 4)):
+        start = year - rnd.randint(1, 4)
+        lines.append(f"{rnd.choice(ROLES)} | {rnd.choice(COMPANIES)} | {start} – {year}")
+        for _ in range(rnd.randint(2, 5)):
+            lines.append(f"• {rnd.choice(VERBS)} {rnd.choice(OBJECTS)}, improving throughput by {rnd.randint(5, 60)}%")
+        lines.append("")
+        year = start
+    lines += [
+        "EDUCATION",
+        f"Bachelor of Science in Computer Science | State University | {year}",
+        "",
+        "SKILLS",
+        f"Languages: {', '.join(rnd.sample(SKILLS, 4))}",
+        f"Tools: {', '.join(rnd.sample(SKILLS, 3))}",
+        "",
+        "PROJECTS",
+        f"Portfolio Project | {year + 1}",
+        f"• {rnd.choice(VERBS)} {rnd.choice(OBJECTS)} for an open-source community",
+        "",
+        "CERTIFICATIONS",
+        f"AWS Certified Cloud Practitioner | Amazon | {year + 2}",
+    ]
+    return "\n".join(lines)
+
+
+def sample_corpus(n=50, seed=0):
+    return [sample_resume(seed + i) for i in range(n)]
@@ -0,0 +1,178 @@
+"""
+Offline stand-ins for the OpenAI chat model and the HuggingFace
+embedding model, for benchmarks and local runs without an API key,
+quota or model download.
+"""
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+import zlib
+
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.corpus import VERBS, OBJECTS, sample_resume
+from resume_parser import extract_section, is_header, section_heading
+
+SECTION_TASK_RE = re.compile(r'Start with the line "([^"]+)"')
+
+
+class FakeRateLimitError(Exception):
+    """Mimics openai.RateLimitError closely enough for llm_scheduler."""
+    status_code = 429
+
+
+class FakeMessage:
+    """Minimal AIMessage/AIMessageChunk: `.content` plus usage metadata."""
+    __slots__ = ("content", "usage_metadata")
+
+    def __init__(self, content, usage_metadata=None):
+        self.content = content
+        self.usage_metadata = usage_metadata
+
+
+class FakeChatModel:
+    """
+    Chat model with invoke/ainvoke/stream that returns a sample resume.
+    Output is derived from the prompt, so the same prompt gets the same
+    answer regardless of call order; latency is drawn per call, so a
+    retried or hedged request is independent of the original.
+
+    output_chars:     pad the resume with extra bullets up to this size
+    latency:          seconds before the first token (mean)
+    latency_jitter:   extra uniform latency in [0, latency_jitter]
+    slow_rate:        fraction of calls that take `slow_latency` instead
+    tokens_per_second: decode speed; 0 returns the whole text at once
+    rate_limit_rate:  fraction of calls that fail with a 429
+    max_concurrency:  calls beyond this many in flight fail with a 429
+    """
+
+    def __init__(self, latency=0.2, latency_jitter=0.1, slow_rate=0.0, slow_latency=5.0,
+                 tokens_per_second=0, rate_limit_rate=0.0, max_concurrency=None, output_chars=0, seed=0):
+        self.output_chars = output_chars
+        self.seed = seed
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.tokens_per_second = tokens_per_second
+        self.rate_limit_rate = rate_limit_rate
+        self.max_concurrency = max_concurrency
+        self.model_name = "fake-chat"
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.rate_limited = 0
+
+    # ---------- helpers ----------
+    def _start(self, prompt):
+        """Admit one call; returns (first-token delay, output text) or raises a 429."""
+        with self._lock:
+            self.calls += 1
+            over_limit = self.max_concurrency is not None and self.in_flight >= self.max_concurrency
+            if over_limit or self._rnd.random() < self.rate_limit_rate:
+                self.rate_limited += 1
+                raise FakeRateLimitError("429 Too Many Requests (fake)")
+            self.in_flight += 1
+            # Latency is drawn per call so a hedged duplicate of a slow request can win
+            slow = self._rnd.random() < self.slow_rate
+            delay = (self.slow_latency if slow else self.latency) + self._rnd.uniform(0, self.latency_jitter)
+        # Output is seeded by the prompt so identical requests get identical text
+        text = self._output(random.Random(zlib.crc32(str(prompt).encode("utf-8")) ^ self.seed))
+        # Section prompts (prompt_builder.build_section) get just that section back
+        match = SECTION_TASK_RE.search(str(prompt))
+        if match:
+            key = is_header(match.group(1))
+            text = extract_section(text, key) or section_heading(key)
+        return delay, text
+
+    def _output(self, rnd):
+        text = sample_resume(rnd.randrange(1 << 30))
+        if len(text) >= self.output_chars:
+            return text
+        head, sep, tail = text.partition("\n\nEDUCATION")
+        extra = []
+        size = len(text)
+        while size < self.output_chars:
+            line = f"• {rnd.choice(VERBS)} {rnd.choice(OBJECTS)}, cutting costs by {rnd.randint(5, 60)}%"
+            extra.append(line)
+            size += len(line) + 1
+        return "\n".join([head] + extra) + sep + tail
+
+    def _finish(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _chunks(self, text):
+        # roughly one token per word
+        return text.split(" ") if self.tokens_per_second else [text]
+
+    def _usage(self, prompt, text):
+        prompt_tokens = len(str(prompt)) // 4
+        output_tokens = len(text) // 4
+        return {"input_tokens": prompt_tokens, "output_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens}
+
+    # ---------- chat model API ----------
+    def invoke(self, prompt, **kwargs):
+        delay, text = self._start(prompt)
+        try:
+            time.sleep(delay + (len(self._chunks(text)) / self.tokens_per_second if self.tokens_per_second else 0))
+            return FakeMessage(text, self._usage(prompt, text))
+        finally:
+            self._finish()
+
+    async def ainvoke(self, prompt, **kwargs):
+        delay, text = self._start(prompt)
+        try:
+            await asyncio.sleep(delay + (len(self._chunks(text)) / self.tokens_per_second if self.tokens_per_second else 0))
+            return FakeMessage(text, self._usage(prompt, text))
+        finally:
+            self._finish()
+
+    def stream(self, prompt, **kwargs):
+        delay, text = self._start(prompt)
+        try:
+            time.sleep(delay)
+            chunks = self._chunks(text)
+            for i, chunk in enumerate(chunks):
+                if self.tokens_per_second:
+                    time.sleep(1.0 / self.tokens_per_second)
+                yield FakeMessage(chunk if i == len(chunks) - 1 else chunk + " ")
+        finally:
+            self._finish()
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic hashed bag-of-words embeddings (unit length), with the
+    same dimension as all-MiniLM-L6-v2 so they fit indexes of that shape.
+    Texts sharing words get similar vectors, which keeps search meaningful.
+    """
+
+    def __init__(self, dim=384, latency=0.0):
+        self.dim = dim
+        self.latency = latency
+
+    def _embed(self, text):
+        vector = [0.0] * self.dim
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            slot = int.from_bytes(digest[:4], "little") % self.dim
+            vector[slot] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        if self.latency:
+            time.sleep(self.latency * len(texts))
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._embed(text)
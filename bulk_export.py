@@ -0,0 +1,176 @@
+"""
+Bulk export of many resumes as one ZIP archive, streamed.
+
+    python bulk_export.py batch_output/ --out cohort.zip [--workers 4]
+
+Resumes come from an iterable of (name, resume text) pairs and are
+rendered one at a time, through pdf_utils.create_pdf in-process or on a
+RenderPool. Each PDF is written into the ZIP as soon as it is ready and
+then dropped, so memory stays flat however many resumes are exported:
+at most `window` PDFs are in flight, and iter_zip() hands back the
+archive bytes entry by entry instead of building it in memory. Entries
+keep input order whichever worker finishes first.
+
+The CLI reads the .txt files of a batch.py output directory (in name
+order) and writes the archive to --out, or to stdout with "-".
+"""
+import argparse
+import io
+import os
+import re
+import sys
+import zipfile
+from collections import deque
+
+from metrics import metrics
+from pdf_utils import create_pdf
+
+# PDFs in flight per pool worker; bounds memory while keeping workers busy.
+WINDOW_PER_WORKER = 2
+
+
+def _render_inline(content):
+    buffer = io.BytesIO()
+    with metrics.span("pdf_render", where="inline"):
+        ok = create_pdf(content, buffer)
+    if not ok:  # already counted in errors_total{stage="pdf_build"}
+        raise RuntimeError("PDF rendering failed")
+    return buffer.getvalue()
+
+
+def iter_pdfs(resumes, pool=None, window=None):
+    """
+    Yield (name, PDF bytes or exception) for each (name, text) in
+    `resumes`, in input order. With a RenderPool, at most `window`
+    renders (default WINDOW_PER_WORKER per worker) are submitted ahead
+    of the consumer; RenderPool.map would queue the whole input at once.
+    """
+    if pool is None:
+        for name, content in resumes:
+            try:
+                yield name, _render_inline(content)
+            except Exception as e:
+                yield name, e
+        return
+
+    window = window or WINDOW_PER_WORKER * pool.workers
+    pending = deque()
+    resumes = iter(resumes)
+    while True:
+        for name, content in resumes:
+            pending.append((name, pool.submit(content)))
+            if len(pending) >= window:
+                break
+        if not pending:
+            return
+        name, future = pending.popleft()
+        try:
+            with metrics.span("pdf_render", where="pool"):
+                pdf_bytes = future.result()
+        except Exception as e:
+            yield name, e
+        else:
+            yield name, pdf_bytes
+
+
+def safe_filename(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("._") or "resume"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target collecting what ZipFile writes until drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(resumes, pool=None, window=None, compression=zipfile.ZIP_DEFLATED, stats=None):
+    """
+    Generate a ZIP archive of one PDF per (name, text) in `resumes` as a
+    stream of byte chunks (roughly one per entry). Resumes that fail to
+    render are skipped and listed in `stats["failed"]`; duplicate names
+    get a numeric suffix.
+    """
+    stats = {} if stats is None else stats
+    stats.update(ok=0, failed=[], bytes=0)
+    sink = _ChunkSink()
+    used = set()
+    # ZipFile writes data descriptors after each entry on unseekable output
+    with zipfile.ZipFile(sink, "w", compression=compression) as archive:
+        for name, pdf in iter_pdfs(resumes, pool, window):
+            if isinstance(pdf, Exception):
+                stats["failed"].append(name)
+                continue
+            stem = base = safe_filename(name)
+            n = 1
+            while stem in used:
+                n += 1
+                stem = f"{base}_{n}"
+            used.add(stem)
+            archive.writestr(f"{stem}.pdf", pdf)
+            stats["ok"] += 1
+            chunk = sink.drain()
+            stats["bytes"] += len(chunk)
+            yield chunk
+    chunk = sink.drain()  # central directory
+    stats["bytes"] += len(chunk)
+    yield chunk
+
+
+def write_zip(resumes, fileobj, pool=None, window=None, compression=zipfile.ZIP_DEFLATED):
+    """Stream the archive from iter_zip() into a writable binary file; returns its stats."""
+    stats = {}
+    for chunk in iter_zip(resumes, pool, window, compression, stats):
+        fileobj.write(chunk)
+    return stats
+
+
+def iter_text_files(directory):
+    """Yield (stem, text) for each .txt file in `directory`, reading one at a time."""
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                yield filename[:-4], f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input_dir", help="directory of resume .txt files (e.g. a batch.py --out-dir)")
+    parser.add_argument("--out", default="resumes.zip", help='archive path, or "-" for stdout')
+    parser.add_argument("--workers", type=int, default=0, help="PDF render processes (default: in-process)")
+    parser.add_argument("--store", action="store_true", help="store PDFs uncompressed")
+    args = parser.parse_args()
+
+    compression = zipfile.ZIP_STORED if args.store else zipfile.ZIP_DEFLATED
+    resumes = iter_text_files(args.input_dir)
+    pool = None
+    if args.workers:
+        from render_pool import RenderPool
+        pool = RenderPool(args.workers)
+    try:
+        if args.out == "-":
+            stats = write_zip(resumes, sys.stdout.buffer, pool, compression=compression)
+        else:
+            with open(args.out, "wb") as f:
+                stats = write_zip(resumes, f, pool, compression=compression)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    print(f"ok: {stats['ok']}, failed: {len(stats['failed'])}, bytes: {stats['bytes']}", file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
+import logging
 import os
+import threading
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
 
 # Load .env variables if present (won't raise if missing)
 load_dotenv()
@@ -18,14 +19,126 @@ if not OPENAI_API_KEY:
     st.error("OpenAI API key not found. Please set in .env or Streamlit secrets.")
     st.stop()
 
-@st.cache_resource
-def initialize_components():
+MODEL_NAME = "gpt-4o-mini"
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Set WARMUP_MODELS=1 to load the LLM client and embedding model in a
+# background thread right after the first page render.
+WARMUP_MODELS = os.getenv("WARMUP_MODELS", "0") == "1"
+
+# Client-side request shaping for LLM calls (see llm_scheduler.py).
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+# Send a second, hedged request when the first takes longer than this (0 disables)
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "30"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+# "single": one call writes the whole resume; "sections": one concurrent
+# call per section, merged in CANON_ORDER (lower latency, more input tokens)
+GENERATION_MODE = os.getenv("GENERATION_MODE", "single").lower()
+
+logger = logging.getLogger(__name__)
+
+# Heavy clients are created on first use, not at import time, so the first
+# page paints before langchain_openai / torch / sentence-transformers load.
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                try:
+                    from langchain_openai import ChatOpenAI
+                    from llm_scheduler import ScheduledChatModel
+                    # retries are handled by the scheduler, not the OpenAI client
+                    chat = ChatOpenAI(model=MODEL_NAME, api_key=OPENAI_API_KEY,
+                                      timeout=LLM_TIMEOUT, max_retries=0, stream_usage=True)
+                    _llm = ScheduledChatModel(
+                        chat,
+                        requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                        tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                        max_retries=LLM_MAX_RETRIES,
+                        hedge_after=LLM_HEDGE_AFTER or None,
+                        initial_concurrency=min(8, LLM_MAX_CONCURRENCY),
+                        max_concurrency=LLM_MAX_CONCURRENCY,
+                    )
+                    from metrics import metrics
+                    metrics.register_collector("llm", _llm.stats)
+                except Exception as e:
+                    st.error(f"Failed to initialize LLM: {str(e)}")
+                    st.stop()
+    return _llm
+
+
+
+class LazyEmbeddings(Embeddings):
+    """
+    Embeddings proxy that loads the HuggingFace model on the first embed
+    call. Loading a saved FAISS index or answering field lookups from
+    metadata never touches the model, so it stays unloaded unless vector
+    search is actually needed.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                    self._model = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._model
+
+    def embed_documents(self, texts):
+        return self.model.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.model.embed_query(text)
+
+
+_embeddings = LazyEmbeddings()
+
+
+def get_embeddings():
+    return _embeddings
+
+
+_warmup_thread = None
+
+
+def _warmup():
     try:
-        llm = ChatOpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY, timeout=120)
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        return llm, embeddings
-    except Exception as e:
-        st.error(f"Failed to initialize LLM or embeddings: {str(e)}")
-        st.stop()
-
-llm, embeddings = initialize_components()
+        get_llm()
+        get_embeddings().model
+    except Exception:
+        logger.exception("Model warm-up failed")
+
+
+def start_warmup():
+    """Start the optional background warm-up thread (idempotent)."""
+    global _warmup_thread
+    if _warmup_thread is None:
+        _warmup_thread = threading.Thread(target=_warmup, name="model-warmup", daemon=True)
+        _warmup_thread.start()
+    return _warmup_thread
+
+
+def __getattr__(name):
+    # Backwards compatible `from config import llm, embeddings`; prefer the
+    # getters, which don't force initialization at import time.
+    if name == "llm":
+        return get_llm()
+    if name == "embeddings":
+        return get_embeddings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,221 @@
+# exporters.py
+import html
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from metrics import metrics
+from pdf_utils import create_pdf_bytes
+from resume_parser import parse_resume, section_title
+
+
+def section_blocks(key, sec):
+    """
+    Flatten a section into (kind, text) blocks in the same order the PDF
+    layout uses. kind is one of: "job", "bullet", "para", "skill", "note".
+    "skill" text is a (category, items) pair.
+    """
+    if key == "SUMMARY":
+        for p in sec.paras:
+            yield "para", p
+    elif key == "EXPERIENCE":
+        for entry in sec.entries:
+            yield "job", entry.header
+            for btxt in entry.bullets:
+                yield "bullet", btxt
+        for btxt in sec.bullets:
+            yield "bullet", btxt
+        for p in sec.paras:
+            yield "para", p
+    elif key == "SKILLS":
+        for ln in sec.lines:
+            if ":" in ln:
+                cat, items = ln.split(":", 1)
+                yield "skill", (cat.strip(), items.strip())
+            else:
+                yield "para", ln
+        for btxt in sec.bullets:
+            yield "bullet", btxt
+        for p in sec.paras:
+            yield "para", p
+    elif key in ("EDUCATION", "CERTIFICATIONS", "PROJECTS"):
+        for ln in sec.lines:
+            yield "para", ln
+        for btxt in sec.bullets:
+            yield "bullet", btxt
+        for p in sec.paras:
+            yield "para", p
+    elif key == "NOTE":
+        for p in sec.paras:
+            yield "note", p
+
+
+# ---------- renderers: ParsedResume -> bytes ----------
+def render_text(parsed):
+    """Plain ATS-friendly text: ALL CAPS headings, "•" bullets, no markup."""
+    out = []
+    if parsed.name:
+        out.append(parsed.name)
+    if parsed.contacts:
+        out.append(" | ".join(parsed.unique_contacts()))
+    for key, sec in parsed.iter_sections():
+        out.append("")
+        out.append(section_title(key).upper())
+        for kind, text in section_blocks(key, sec):
+            if kind == "bullet":
+                out.append(f"• {text}")
+            elif kind == "skill":
+                out.append(f"{text[0]}: {text[1]}")
+            else:
+                out.append(text)
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+def render_markdown(parsed):
+    blocks = []  # (kind, markdown); consecutive bullets form one list
+    if parsed.name:
+        blocks.append(("heading", f"# {parsed.name}"))
+    if parsed.contacts:
+        blocks.append(("para", " | ".join(parsed.unique_contacts())))
+    for key, sec in parsed.iter_sections():
+        blocks.append(("heading", f"## {section_title(key)}"))
+        for kind, text in section_blocks(key, sec):
+            if kind == "job":
+                blocks.append((kind, f"**{text}**"))
+            elif kind == "bullet":
+                blocks.append((kind, f"- {text}"))
+            elif kind == "skill":
+                blocks.append((kind, f"**{text[0]}:** {text[1]}"))
+            elif kind == "note":
+                blocks.append((kind, f"*{text}*"))
+            else:
+                blocks.append((kind, text))
+    out = []
+    for i, (kind, text) in enumerate(blocks):
+        if i:
+            out.append("\n" if kind == "bullet" and blocks[i - 1][0] == "bullet" else "\n\n")
+        out.append(text)
+    return ("".join(out) + "\n").encode("utf-8")
+
+
+_HTML_STYLE = (
+    "body{font-family:Helvetica,Arial,sans-serif;color:#1f2937;max-width:48rem;margin:2rem auto;font-size:10.5pt}"
+    "h1{color:#111827;margin-bottom:.2rem}.contact{color:#4b5563;font-size:9.5pt;border-bottom:1px solid #e5e7eb;"
+    "padding-bottom:.5rem}h2{color:#111827;font-size:12.5pt;margin:1rem 0 .3rem}"
+    ".job{font-weight:bold;margin:.4rem 0 .2rem}.note{color:#6b7280;font-style:italic;font-size:9pt}"
+    "ul{margin:.2rem 0}p{margin:.2rem 0}"
+)
+
+
+def render_html(parsed):
+    esc = html.escape
+    out = ["<!DOCTYPE html>", '<html lang="en"><head><meta charset="utf-8">',
+           f"<title>{esc(parsed.name or 'Resume')}</title><style>{_HTML_STYLE}</style></head><body>"]
+    if parsed.name:
+        out.append(f"<h1>{esc(parsed.name)}</h1>")
+    if parsed.contacts:
+        out.append(f'<p class="contact">{" &nbsp;|&nbsp; ".join(esc(c) for c in parsed.unique_contacts())}</p>')
+    for key, sec in parsed.iter_sections():
+        out.append(f"<section><h2>{esc(section_title(key))}</h2>")
+        in_list = False
+        for kind, text in section_blocks(key, sec):
+            if kind == "bullet" and not in_list:
+                out.append("<ul>")
+                in_list = True
+            elif kind != "bullet" and in_list:
+                out.append("</ul>")
+                in_list = False
+            if kind == "bullet":
+                out.append(f"<li>{esc(text)}</li>")
+            elif kind == "job":
+                out.append(f'<p class="job">{esc(text)}</p>')
+            elif kind == "skill":
+                out.append(f"<p><b>{esc(text[0])}:</b> {esc(text[1])}</p>")
+            elif kind == "note":
+                out.append(f'<p class="note">{esc(text)}</p>')
+            else:
+                out.append(f"<p>{esc(text)}</p>")
+        if in_list:
+            out.append("</ul>")
+        out.append("</section>")
+    out.append("</body></html>")
+    return "\n".join(out).encode("utf-8")
+
+
+def render_docx(parsed):
+    from docx import Document
+    from docx.shared import Pt
+
+    document = Document()
+    if parsed.name:
+        document.add_heading(parsed.name, level=0)
+    if parsed.contacts:
+        document.add_paragraph("  |  ".join(parsed.unique_contacts()))
+    for key, sec in parsed.iter_sections():
+        document.add_heading(section_title(key), level=1)
+        for kind, text in section_blocks(key, sec):
+            if kind == "bullet":
+                document.add_paragraph(text, style="List Bullet")
+            elif kind == "job":
+                document.add_paragraph().add_run(text).bold = True
+            elif kind == "skill":
+                para = document.add_paragraph()
+                para.add_run(f"{text[0]}: ").bold = True
+                para.add_run(text[1])
+            elif kind == "note":
+                run = document.add_paragraph().add_run(text)
+                run.italic = True
+                run.font.size = Pt(9)
+            else:
+                document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+# format -> (renderer, mime type, file extension); "pdf" is handled by create_pdf_bytes
+FORMATS = {
+    "pdf": (None, "application/pdf", "pdf"),
+    "docx": (render_docx, "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"),
+    "html": (render_html, "text/html", "html"),
+    "md": (render_markdown, "text/markdown", "md"),
+    "txt": (render_text, "text/plain", "txt"),
+}
+
+
+def _render_timed(fmt, parsed):
+    with metrics.span("export", format=fmt):
+        return FORMATS[fmt][0](parsed)
+
+
+def export_resume(resume_content, formats, parsed=None, max_workers=None):
+    """
+    Render `resume_content` into every requested format concurrently from a
+    single parse. Returns {format: bytes}; formats that failed are omitted
+    and reported with st.error, as create_pdf does.
+
+    Non-PDF formats render on a thread pool while the PDF (which goes
+    through create_pdf_bytes and its cache) renders on the calling thread,
+    so errors are always reported from the Streamlit script thread.
+    """
+    if parsed is None:
+        parsed = parse_resume(resume_content)
+    formats = list(dict.fromkeys(formats))
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(unknown)}")
+
+    results = {}
+    others = [fmt for fmt in formats if fmt != "pdf"]
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(others))) as pool:
+        futures = {fmt: pool.submit(_render_timed, fmt, parsed) for fmt in others}
+        if "pdf" in formats:
+            with metrics.span("export", format="pdf"):
+                results["pdf"] = create_pdf_bytes(resume_content, parsed)
+        for fmt, future in futures.items():
+            try:
+                results[fmt] = future.result()
+            except Exception as e:
+                st.error(f"Error creating {fmt.upper()}: {str(e)}")
+    return {fmt: results[fmt] for fmt in formats if results.get(fmt) is not None}
@@ -0,0 +1,96 @@
+# generation_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.getenv("GENERATION_CACHE_PATH", "./generation_cache.sqlite3")
+CACHE_TTL_SECONDS = int(os.getenv("GENERATION_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "5000"))
+
+
+def normalize_details(user_details):
+    """Collapse indentation/blank lines/whitespace runs so cosmetic edits hit the same entry."""
+    lines = (" ".join(ln.split()) for ln in user_details.splitlines())
+    return "\n".join(ln for ln in lines if ln)
+
+
+def request_fingerprint(user_details, job_field, prompt_version, model_name):
+    payload = json.dumps(
+        [normalize_details(user_details), job_field.strip().lower(), prompt_version, model_name],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """
+    SQLite-backed cache of generated resumes with TTL and size-based
+    eviction (least recently used first). One connection is shared by all
+    Streamlit sessions in the process and guarded by a lock; WAL mode lets
+    other processes on the host read the same file concurrently.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS generations ("
+                " key TEXT PRIMARY KEY,"
+                " content TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS generations_accessed ON generations (accessed)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT content, created FROM generations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE generations SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, content):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generations (key, content, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, content, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM generations WHERE created < ?", (now - self.ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM generations").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM generations WHERE key IN ("
+                " SELECT key FROM generations ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM generations").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM generations")
@@ -0,0 +1,155 @@
+"""
+Pickle-free, memory-mapped persistence for the template vector store.
+
+On-disk layout (inside the index folder):
+  index.faiss            raw FAISS index (faiss.write_index)
+  docstore.jsonl         one JSON document per line, in index order
+  docstore.offsets.npy   int64 byte offsets of each line (n + 1 entries)
+
+load_index(..., mmap=True) maps all three files read-only, so worker
+processes on one host share the OS page cache instead of each holding a
+private, unpickled copy. mmap=False loads a writable in-memory store (used
+by ingest.py for incremental updates).
+"""
+import json
+import mmap
+import os
+from collections.abc import Mapping
+
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.jsonl"
+OFFSETS_FILE = "docstore.offsets.npy"
+LEGACY_PICKLE_FILE = "index.pkl"
+
+
+def has_index(folder):
+    return all(os.path.exists(os.path.join(folder, name)) for name in (INDEX_FILE, DOCSTORE_FILE, OFFSETS_FILE))
+
+
+class MmapDocstore(Docstore):
+    """
+    Read-only docstore over docstore.jsonl. Documents are addressed by
+    their index position (as a string, see PositionalIds) and decoded on
+    demand from the memory-mapped file.
+    """
+
+    def __init__(self, folder):
+        self._offsets = np.load(os.path.join(folder, OFFSETS_FILE), mmap_mode="r")
+        self._file = open(os.path.join(folder, DOCSTORE_FILE), "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def record(self, position):
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        return json.loads(self._data[start:end])
+
+    def search(self, search):
+        try:
+            position = int(search)
+        except (TypeError, ValueError):
+            return f"ID {search} not found."
+        if not 0 <= position < len(self):
+            return f"ID {search} not found."
+        rec = self.record(position)
+        return Document(page_content=rec["page_content"], metadata=rec["metadata"])
+
+
+class PositionalIds(Mapping):
+    """index_to_docstore_id for MmapDocstore: position i -> "i", without building a dict."""
+
+    def __init__(self, size):
+        self._size = size
+
+    def __getitem__(self, position):
+        if not 0 <= position < self._size:
+            raise KeyError(position)
+        return str(position)
+
+    def __iter__(self):
+        return iter(range(self._size))
+
+    def __len__(self):
+        return self._size
+
+
+def _replace(tmp_path, path):
+    os.replace(tmp_path, path)
+
+
+def save_index(vectorstore, folder):
+    """Write `vectorstore` (a LangChain FAISS store) in the mmap-friendly format."""
+    import faiss
+    os.makedirs(folder, exist_ok=True)
+    docstore_path = os.path.join(folder, DOCSTORE_FILE)
+    offsets_path = os.path.join(folder, OFFSETS_FILE)
+    index_path = os.path.join(folder, INDEX_FILE)
+
+    offsets = [0]
+    with open(docstore_path + ".tmp", "wb") as f:
+        for position in range(vectorstore.index.ntotal):
+            doc_id = vectorstore.index_to_docstore_id[position]
+            doc = vectorstore.docstore.search(doc_id)
+            line = json.dumps(
+                {"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata},
+                ensure_ascii=False, separators=(",", ":"),
+            ).encode("utf-8") + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    with open(offsets_path + ".tmp", "wb") as f:
+        np.save(f, np.asarray(offsets, dtype=np.int64))
+    faiss.write_index(vectorstore.index, index_path + ".tmp")
+
+    _replace(docstore_path + ".tmp", docstore_path)
+    _replace(offsets_path + ".tmp", offsets_path)
+    _replace(index_path + ".tmp", index_path)
+    # A stale pickle next to the new files would no longer match the index.
+    legacy_path = os.path.join(folder, LEGACY_PICKLE_FILE)
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+
+def _read_index_mmap(index_path):
+    import faiss
+    # IO_FLAG_MMAP maps IVF inverted lists, IO_FLAG_MMAP_IFC (faiss >= 1.8)
+    # maps flat/HNSW/PQ code storage. Some index types reject one of the
+    # flags, so try the combinations from most to least shared.
+    mmap_ifc = getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    candidates = [faiss.IO_FLAG_MMAP | mmap_ifc, faiss.IO_FLAG_MMAP, mmap_ifc]
+    for flags in candidates:
+        try:
+            return faiss.read_index(index_path, flags | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            continue
+    return faiss.read_index(index_path)
+
+
+def load_index(folder, embeddings, mmap=True):
+    """Load a store written by save_index; see the module docstring for `mmap`."""
+    import faiss
+    index_path = os.path.join(folder, INDEX_FILE)
+    if not mmap:
+        index = faiss.read_index(index_path)
+        docstore = MmapDocstore(folder)
+        records = [docstore.record(position) for position in range(len(docstore))]
+        return FAISS(
+            embeddings,
+            index,
+            InMemoryDocstore({
+                rec["id"]: Document(page_content=rec["page_content"], metadata=rec["metadata"])
+                for rec in records
+            }),
+            {position: rec["id"] for position, rec in enumerate(records)},
+        )
+
+    index = _read_index_mmap(index_path)
+    docstore = MmapDocstore(folder)
+    return FAISS(embeddings, index, docstore, PositionalIds(len(docstore)))
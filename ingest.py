@@ -0,0 +1,202 @@
+"""
+Bulk template ingestion into the FAISS index used by vectorstore.py.
+
+    python ingest.py TEMPLATE_DIR [--index-dir ./faiss_index] [--batch-size 64]
+
+Template files (*.txt, *.md) are streamed from TEMPLATE_DIR. The first
+sub-directory under it names the job field, e.g.
+templates/Data Science/senior_ds.txt -> metadata job_field "Data Science".
+
+A content-hash manifest next to the index records what was ingested, so a
+re-run only embeds new or changed files and deletes entries whose source
+file disappeared. The first run replaces the built-in sample index.
+Restart the app to pick up the updated index.
+"""
+import argparse
+import hashlib
+import json
+import os
+
+from langchain_community.vectorstores import FAISS
+
+from index_store import has_index, load_index, save_index
+from vectorstore import INDEX_DIR, build_vectorstore, configure_search
+
+SUPPORTED_SUFFIXES = (".txt", ".md")
+# Vectors buffered before a new index is built, so IVF/PQ have data to train on.
+TRAIN_SIZE = 10000
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def iter_template_files(root):
+    """Yield template paths under `root` in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(SUPPORTED_SUFFIXES):
+                yield os.path.join(dirpath, filename)
+
+
+def read_template(path, root):
+    """Return (source, text, metadata) for one template file."""
+    source = os.path.relpath(path, root).replace(os.sep, "/")
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    metadata = {"source": source}
+    parts = source.split("/")
+    if len(parts) > 1:
+        metadata["job_field"] = parts[0]
+    return source, text, metadata
+
+
+def content_hash(text, metadata):
+    payload = json.dumps([text, metadata], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def doc_id_for(source):
+    # Stable per source file, so a changed file replaces its own entry.
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+def load_manifest(index_dir):
+    path = os.path.join(index_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": MANIFEST_VERSION, "embedding_model": None, "files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(index_dir, manifest):
+    path = os.path.join(index_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+class _IndexWriter:
+    """Buffers additions/deletions and applies them to the store in batches."""
+
+    def __init__(self, vectorstore, embeddings, batch_size, train_size=TRAIN_SIZE):
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.train_size = train_size
+        self.pending = []  # (doc_id, text, metadata)
+        self.pending_deletes = []
+        self.embedded = []  # (text, vector) pairs waiting for the initial build
+        self.embedded_meta = []
+        self.embedded_count = 0
+
+    def delete(self, doc_id):
+        self.pending_deletes.append(doc_id)
+
+    def add(self, doc_id, text, metadata):
+        self.pending.append((doc_id, text, metadata))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self, final=False):
+        if self.pending_deletes and self.vectorstore is not None:
+            try:
+                self.vectorstore.delete(self.pending_deletes)
+            except RuntimeError as e:
+                # e.g. HNSW indexes do not support removal
+                raise RuntimeError(f"Index does not support deletes ({e}); re-run with --rebuild") from e
+        self.pending_deletes = []
+        if self.pending:
+            ids, texts, metadatas = zip(*self.pending)
+            vectors = self.embeddings.embed_documents(list(texts))
+            self.embedded.extend(zip(texts, vectors))
+            self.embedded_meta.extend(zip(ids, metadatas))
+            self.embedded_count += len(ids)
+            self.pending = []
+        if not self.embedded:
+            return
+        if self.vectorstore is None and not final and len(self.embedded) < self.train_size:
+            return  # keep buffering training data for the first build
+        ids, metadatas = (list(x) for x in zip(*self.embedded_meta))
+        if self.vectorstore is None:
+            self.vectorstore = build_vectorstore(self.embedded, self.embeddings, metadatas=metadatas, ids=ids)
+        else:
+            self.vectorstore.add_embeddings(self.embedded, metadatas=metadatas, ids=ids)
+        self.embedded = []
+        self.embedded_meta = []
+
+
+def ingest_directory(root, embeddings, index_dir=INDEX_DIR, batch_size=64, embedding_model=None, rebuild=False):
+    """
+    Sync the FAISS index in `index_dir` with the templates under `root`.
+    Returns counts of added/updated/deleted/unchanged files.
+    `rebuild` ignores the manifest and builds a fresh index (using the
+    configured FAISS_INDEX_TYPE) from every file.
+    """
+    manifest = load_manifest(index_dir)
+    if rebuild or (embedding_model and manifest.get("embedding_model") not in (None, embedding_model)):
+        # Vectors from a different model can't be mixed; start over.
+        manifest = {"version": MANIFEST_VERSION, "embedding_model": None, "files": {}}
+    vectorstore = None
+    if manifest["files"]:
+        if has_index(index_dir):
+            vectorstore = load_index(index_dir, embeddings, mmap=False)
+        else:
+            vectorstore = FAISS.load_local(index_dir, embeddings, allow_dangerous_deserialization=True)
+        configure_search(vectorstore.index)
+
+    writer = _IndexWriter(vectorstore, embeddings, batch_size)
+    old_files = manifest["files"]
+    new_files = {}
+    counts = {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    for path in iter_template_files(root):
+        source, text, metadata = read_template(path, root)
+        if not text:
+            continue
+        digest = content_hash(text, metadata)
+        doc_id = doc_id_for(source)
+        new_files[source] = {"hash": digest, "id": doc_id}
+        previous = old_files.get(source)
+        if previous and previous["hash"] == digest:
+            counts["unchanged"] += 1
+            continue
+        if previous:
+            writer.delete(previous["id"])
+            counts["updated"] += 1
+        else:
+            counts["added"] += 1
+        writer.add(doc_id, text, metadata)
+
+    for source, entry in old_files.items():
+        if source not in new_files:
+            writer.delete(entry["id"])
+            counts["deleted"] += 1
+    writer.flush(final=True)
+    counts["embedded"] = writer.embedded_count
+
+    if writer.vectorstore is not None and (counts["added"] or counts["updated"] or counts["deleted"]):
+        save_index(writer.vectorstore, index_dir)
+    manifest = {"version": MANIFEST_VERSION, "embedding_model": embedding_model, "files": new_files}
+    os.makedirs(index_dir, exist_ok=True)
+    save_manifest(index_dir, manifest)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("template_dir")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--rebuild", action="store_true",
+                        help="build a fresh index, e.g. after changing FAISS_INDEX_TYPE")
+    args = parser.parse_args()
+
+    from config import get_embeddings, EMBEDDING_MODEL_NAME
+    counts = ingest_directory(args.template_dir, get_embeddings(), args.index_dir,
+                              args.batch_size, embedding_model=EMBEDDING_MODEL_NAME, rebuild=args.rebuild)
+    print(", ".join(f"{k}: {v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+# llm_scheduler.py
+"""
+Client-side request shaping for chat model calls.
+
+ScheduledChatModel wraps any object with invoke/ainvoke/stream (ChatOpenAI
+in production, fakes.FakeChatModel offline) and adds:
+  - token buckets for requests/minute and tokens/minute
+  - retries with full-jitter exponential backoff (honouring Retry-After)
+  - a hedged second request when the first exceeds a latency threshold
+    (for stream(), when the first chunk is that late)
+  - AIMD adaptive concurrency: +1 slot per window of successes, halved
+    on every 429
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"}
+
+
+def _status_code(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limit(exc):
+    return _status_code(exc) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def is_retryable(exc):
+    return (
+        _status_code(exc) in RETRYABLE_STATUS
+        or type(exc).__name__ in RETRYABLE_ERROR_NAMES
+        or isinstance(exc, (TimeoutError, ConnectionError))
+    )
+
+
+def retry_after_seconds(exc):
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English text; close enough for budgeting
+    return max(1, len(text) // 4)
+
+
+def _prompt_text(prompt):
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, (list, tuple)):
+        return "".join(str(getattr(m, "content", m)) for m in prompt)
+    return str(getattr(prompt, "text", prompt))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute`.
+    reserve() takes tokens immediately (the balance may go negative) and
+    returns how long the caller must wait, so waiters are served in
+    arrival order without holding the lock while sleeping.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount=1):
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return True
+            return False
+
+    def refund(self, amount):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit shared by sync and async callers."""
+
+    def __init__(self, initial=8, minimum=1, maximum=32, decrease=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def try_acquire(self):
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    async def aacquire(self, poll=0.01):
+        while not self.try_acquire():
+            await asyncio.sleep(poll)
+
+    def release(self, rate_limited=False, success=True):
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+            elif success:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+_END = object()
+
+
+def _close_stream(iterator):
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+def _close_opened_stream(future):
+    # done callback for the losing stream of a hedged pair
+    if not future.cancelled() and future.exception() is None:
+        _close_stream(future.result()[1])
+
+
+class ScheduledChatModel:
+    """Chat model wrapper applying rate limits, retries, hedging and AIMD concurrency."""
+
+    def __init__(self, model, requests_per_minute=500, tokens_per_minute=200_000,
+                 expected_output_tokens=900, max_retries=4, backoff_base=0.5, backoff_max=20.0,
+                 hedge_after=None, initial_concurrency=8, min_concurrency=1, max_concurrency=32,
+                 sleep=time.sleep):
+        self.model = model
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.expected_output_tokens = expected_output_tokens
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, min_concurrency, max_concurrency)
+        self._sleep = sleep
+        self._hedge_pool = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix="llm-hedge")
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "rate_limited": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+
+    def __getattr__(self, name):
+        # model_name, etc. from the wrapped model
+        return getattr(self.model, name)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, concurrency_limit=round(self.concurrency.limit, 2),
+                        in_flight=self.concurrency.in_flight)
+
+    # ---------- admission / backoff ----------
+    def _admission_delay(self, prompt):
+        cost = estimate_tokens(_prompt_text(prompt)) + self.expected_output_tokens
+        return max(self.request_bucket.reserve(1), self.token_bucket.reserve(cost))
+
+    def _backoff(self, attempt, exc):
+        hinted = retry_after_seconds(exc)
+        if hinted is not None:
+            return min(self.backoff_max, hinted)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _after_failure(self, exc, attempt):
+        """Book-keeping for a failed attempt; returns the backoff delay or raises."""
+        rate_limited = is_rate_limit(exc)
+        self.concurrency.release(rate_limited=rate_limited, success=False)
+        if rate_limited:
+            self._count("rate_limited")
+        if attempt >= self.max_retries or not is_retryable(exc):
+            self._count("failures")
+            raise exc
+        self._count("retries")
+        return self._backoff(attempt, exc)
+
+    # ---------- sync ----------
+    def _hedged_invoke(self, prompt, kwargs):
+        if not self.hedge_after:
+            return self.model.invoke(prompt, **kwargs)
+        primary = self._hedge_pool.submit(self.model.invoke, prompt, **kwargs)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        # Hedge only if the request budget allows it right now
+        if not self.request_bucket.try_acquire(1):
+            return primary.result()
+        self._count("hedges")
+        hedge = self._hedge_pool.submit(self.model.invoke, prompt, **kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    # the slower call keeps running in the background; its result is dropped
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def invoke(self, prompt, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self._sleep(self._admission_delay(prompt))
+            self.concurrency.acquire()
+            self._count("requests")
+            try:
+                result = self._hedged_invoke(prompt, kwargs)
+            except Exception as e:
+                self._sleep(self._after_failure(e, attempt))
+                continue
+            self.concurrency.release()
+            return result
+
+    def _open_stream(self, prompt, kwargs):
+        """Start a model stream and wait for its first chunk: (first chunk or _END, iterator)."""
+        iterator = iter(self.model.stream(prompt, **kwargs))
+        return next(iterator, _END), iterator
+
+    @staticmethod
+    def _drain_stream(first, iterator):
+        try:
+            if first is not _END:
+                yield first
+                yield from iterator
+        finally:
+            _close_stream(iterator)
+
+    def _hedged_stream(self, prompt, kwargs):
+        """
+        The model's stream; with hedge_after set, a second stream is opened
+        when the first chunk is late, and whichever produces a chunk first
+        is consumed (the other is closed).
+        """
+        if not self.hedge_after:
+            return self.model.stream(prompt, **kwargs)
+        primary = self._hedge_pool.submit(self._open_stream, prompt, kwargs)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done or not self.request_bucket.try_acquire(1):
+            return self._drain_stream(*primary.result())
+        self._count("hedges")
+        hedge = self._hedge_pool.submit(self._open_stream, prompt, kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is hedge:
+                    self._count("hedge_wins")
+                for other in ({primary, hedge} - {future}):
+                    other.add_done_callback(_close_opened_stream)
+                return self._drain_stream(*future.result())
+        raise error
+
+    def stream(self, prompt, **kwargs):
+        """Retries and hedging apply until the first chunk arrives; later errors propagate."""
+        for attempt in range(self.max_retries + 1):
+            self._sleep(self._admission_delay(prompt))
+            self.concurrency.acquire()
+            self._count("requests")
+            started = False
+            try:
+                for chunk in self._hedged_stream(prompt, kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    self.concurrency.release(rate_limited=is_rate_limit(e), success=False)
+                    self._count("failures")
+                    raise
+                self._sleep(self._after_failure(e, attempt))
+                continue
+            except BaseException:
+                self.concurrency.release(success=False)
+                raise
+            self.concurrency.release()
+            return
+
+    # ---------- async ----------
+    async def _hedged_ainvoke(self, prompt, kwargs):
+        primary = asyncio.ensure_future(self.model.ainvoke(prompt, **kwargs))
+        if not self.hedge_after:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done or not self.request_bucket.try_acquire(1):
+            return await primary
+        self._count("hedges")
+        hedge = asyncio.ensure_future(self.model.ainvoke(prompt, **kwargs))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def ainvoke(self, prompt, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._admission_delay(prompt))
+            await self.concurrency.aacquire()
+            self._count("requests")
+            try:
+                result = await self._hedged_ainvoke(prompt, kwargs)
+            except asyncio.CancelledError:
+                self.concurrency.release(success=False)
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._after_failure(e, attempt))
+                continue
+            self.concurrency.release()
+            return result
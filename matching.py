@@ -0,0 +1,223 @@
+# matching.py
+"""
+Score resumes against job descriptions with the template embedding model.
+
+Every resume is split into units (summary paragraphs, job headers,
+bullets, individual skills) and every JD into requirement rows (one per
+line, skill lists split on commas). All unique texts are embedded in
+batches through an on-disk EmbeddingCache keyed by text hash, then:
+
+  best[r, q]  = max cosine similarity between resume r's units and row q
+  score[r, j] = mean of best[r, q] over JD j's rows
+
+computed as blocked matrix products with np.maximum.reduceat /
+np.add.reduceat, so there are no per-pair Python loops. Rows of a top
+match whose best similarity is below `threshold` are reported as missing.
+"""
+import os
+import re
+
+import numpy as np
+
+from embedding_cache import text_hash
+from metrics import metrics
+from resume_parser import BULLET_CHARS, ParsedResume, parse_resume
+
+# Similarity below which a JD requirement counts as not covered by a resume
+MATCH_THRESHOLD = float(os.getenv("MATCH_THRESHOLD", "0.5"))
+# Texts per embed_documents call
+EMBED_BATCH_SIZE = int(os.getenv("MATCH_EMBED_BATCH_SIZE", "256"))
+# Max float32 elements in one units x requirements product (~64 MB)
+BLOCK_ELEMENTS = 16 * 1024 * 1024
+
+_LABEL_RE = re.compile(r"^([^:]{1,40}):\s*(.+)$")
+
+
+class JobDescription:
+    """A JD as an id, a title and its requirement rows."""
+    __slots__ = ("id", "title", "requirements")
+
+    def __init__(self, id, title, requirements):
+        self.id = id
+        self.title = title
+        self.requirements = requirements
+
+    @classmethod
+    def from_text(cls, id, text, title=None):
+        """
+        First line is the title (unless given); each further line or bullet
+        is a requirement, and 'Label: a, b, c' lines yield one row per item.
+        Lines ending in ':' (sub-headings) are skipped.
+        """
+        lines = [ln.strip().lstrip("".join(BULLET_CHARS)).strip() for ln in text.splitlines()]
+        lines = [ln for ln in lines if ln]
+        if title is None and lines:
+            title, lines = lines[0], lines[1:]
+        requirements = []
+        for ln in lines:
+            if ln.endswith(":"):
+                continue
+            m = _LABEL_RE.match(ln)
+            if m and "," in m.group(2):
+                requirements.extend(item.strip() for item in m.group(2).split(",") if item.strip())
+            else:
+                requirements.append(ln)
+        return cls(id, title, list(dict.fromkeys(requirements)))
+
+
+class Match:
+    __slots__ = ("jd_id", "title", "score", "missing")
+
+    def __init__(self, jd_id, title, score, missing):
+        self.jd_id = jd_id
+        self.title = title
+        self.score = score
+        self.missing = missing
+
+    def __repr__(self):
+        return f"Match({self.jd_id!r}, score={self.score:.3f}, missing={self.missing!r})"
+
+
+def resume_units(parsed):
+    """Texts of a ParsedResume that requirements are compared against."""
+    units = []
+    for key, sec in parsed.iter_sections():
+        if key == "NOTE":
+            continue
+        for entry in sec.entries:
+            units.append(entry.header)
+            units.extend(entry.bullets)
+        for ln in sec.lines:
+            m = _LABEL_RE.match(ln) if key == "SKILLS" else None
+            if m:
+                units.extend(item.strip() for item in m.group(2).split(",") if item.strip())
+            else:
+                units.append(ln)
+        units.extend(sec.bullets)
+        units.extend(sec.paras)
+    return units
+
+
+class ResumeMatcher:
+    """
+    Batch resume x JD scoring. `embeddings` is any LangChain Embeddings
+    (config.get_embeddings() by default); `cache` an EmbeddingCache, or
+    None to embed without caching.
+    """
+
+    def __init__(self, embeddings=None, cache=None, threshold=MATCH_THRESHOLD, batch_size=EMBED_BATCH_SIZE):
+        if embeddings is None:
+            from config import get_embeddings
+            embeddings = get_embeddings()
+        self.embeddings = embeddings
+        self.cache = cache
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.model_name = getattr(embeddings, "model_name", type(embeddings).__name__)
+
+    # ---------- embedding ----------
+    def embed(self, texts):
+        """Unit-normalized float32 matrix (len(texts) x dim); each unique text is embedded once."""
+        unique = list(dict.fromkeys(texts))
+        keys = [text_hash(t, self.model_name) for t in unique]
+        cached = self.cache.get_many(keys) if self.cache is not None else {}
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        with metrics.span("match_embed"):
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                vectors = np.asarray(self.embeddings.embed_documents([unique[i] for i in batch]), dtype=np.float32)
+                new = [(keys[i], vec) for i, vec in zip(batch, vectors)]
+                cached.update(new)
+                if self.cache is not None:
+                    self.cache.set_many(new)
+        if not unique:
+            return np.zeros((0, 0), dtype=np.float32)
+        matrix = np.stack([cached[key] for key in keys])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        position = {t: i for i, t in enumerate(unique)}
+        return matrix[[position[t] for t in texts]]
+
+    # ---------- scoring ----------
+    def _prepare(self, resumes, jds):
+        parsed = [r if isinstance(r, ParsedResume) else parse_resume(r) for r in resumes]
+        units = [resume_units(p) for p in parsed]
+        # empty resumes get one zero row so every resume owns a segment
+        flat_units = [u for us in units for u in us]
+        unit_vectors = self.embed(flat_units)
+        rows = [req for jd in jds for req in jd.requirements]
+        req_vectors = self.embed(rows)
+        dim = unit_vectors.shape[1] if flat_units else req_vectors.shape[1] if rows else 1
+        if not rows:
+            # embed([]) has no dimension to report; keep the product shapes compatible
+            req_vectors = np.zeros((0, dim), dtype=np.float32)
+        blocks, pos = [], 0
+        for us in units:
+            if us:
+                blocks.append(unit_vectors[pos:pos + len(us)])
+                pos += len(us)
+            else:
+                blocks.append(np.zeros((1, dim), dtype=np.float32))
+        unit_counts = np.array([len(b) for b in blocks])
+        req_counts = np.array([len(jd.requirements) for jd in jds])
+        units = np.concatenate(blocks) if blocks else np.zeros((0, dim), dtype=np.float32)
+        return units, unit_counts, req_vectors, req_counts
+
+    def _iter_blocks(self, units, unit_counts, req_vectors, req_counts):
+        """Yield (first resume, best similarity per requirement row, JD scores) per block of resumes."""
+        if not len(unit_counts):
+            return
+        unit_offsets = np.concatenate(([0], np.cumsum(unit_counts)))
+        req_offsets = np.concatenate(([0], np.cumsum(req_counts)))[:-1]
+        has_reqs = req_counts > 0
+        max_units = max(int(unit_counts.max()), BLOCK_ELEMENTS // max(1, len(req_vectors)))
+        first = 0
+        while first < len(unit_counts):
+            last = int(np.searchsorted(unit_offsets, unit_offsets[first] + max_units, side="right")) - 1
+            last = max(last, first + 1)
+            u0, u1 = unit_offsets[first], unit_offsets[last]
+            sims = units[u0:u1] @ req_vectors.T
+            best = np.maximum.reduceat(sims, unit_offsets[first:last] - u0, axis=0)
+            scores = np.zeros((last - first, len(req_counts)), dtype=np.float32)
+            if len(req_vectors):
+                sums = np.add.reduceat(best, req_offsets[has_reqs], axis=1)
+                scores[:, has_reqs] = sums / req_counts[has_reqs]
+            yield first, best, scores
+            first = last
+
+    def score_matrix(self, resumes, jds):
+        """(len(resumes) x len(jds)) array of match scores in [-1, 1]."""
+        prepared = self._prepare(resumes, jds)
+        with metrics.span("match_score"):
+            out = np.zeros((len(prepared[1]), len(jds)), dtype=np.float32)
+            for first, _, scores in self._iter_blocks(*prepared):
+                out[first:first + len(scores)] = scores
+        return out
+
+    def match(self, resumes, jds, top_k=5):
+        """
+        For each resume (text or ParsedResume), its top_k JDs as Match
+        objects, best first, each with the requirements it does not cover.
+        """
+        jds = list(jds)
+        prepared = self._prepare(resumes, jds)
+        req_offsets = np.concatenate(([0], np.cumsum(prepared[3])))
+        k = min(top_k, len(jds))
+        results = []
+        with metrics.span("match_score"):
+            for _, best, scores in self._iter_blocks(*prepared):
+                if not k:
+                    results.extend([] for _ in range(len(scores)))
+                    continue
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+                top = np.take_along_axis(top, order, axis=1)
+                for i, jd_indices in enumerate(top):
+                    matches = []
+                    for j in jd_indices:
+                        jd = jds[j]
+                        uncovered = np.flatnonzero(best[i, req_offsets[j]:req_offsets[j + 1]] < self.threshold)
+                        matches.append(Match(jd.id, jd.title, float(scores[i, j]),
+                                             [jd.requirements[q] for q in uncovered]))
+                    results.append(matches)
+        return results
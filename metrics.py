@@ -0,0 +1,245 @@
+# metrics.py
+"""
+In-process instrumentation: per-stage latency spans, counters and
+Prometheus text export.
+
+    from metrics import metrics
+    with metrics.span("retrieval"):
+        ...
+    metrics.inc("cache_requests_total", cache="pdf", result="hit")
+
+Recording a span is a perf_counter pair, one lock and a deque append, so
+it stays on in production. Quantiles (p50/p95/p99) come from a sliding
+window of the last WINDOW observations per series; _sum and _count are
+cumulative, as Prometheus summaries expect.
+
+Export: metrics.render_prometheus(), metrics.dump(path), or set
+METRICS_PORT to serve /metrics over HTTP (start_metrics_server). Set
+PROFILE_SAMPLE_RATE (0..1) to cProfile that fraction of requests into
+PROFILE_DIR (see profile_request).
+"""
+import cProfile
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_PREFIX = "resume_"
+WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+logger = logging.getLogger(__name__)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+
+class _Series:
+    __slots__ = ("window", "count", "total")
+
+    def __init__(self):
+        self.window = deque(maxlen=WINDOW)
+        self.count = 0
+        self.total = 0.0
+
+
+def quantile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = {}  # (stage, labels) -> _Series
+        self._counters = {}  # (name, labels) -> int
+        self._collectors = {}  # name -> callable returning {metric: number}
+
+    # ---------- recording ----------
+    def observe(self, stage, seconds, **labels):
+        key = (stage, _label_key(labels))
+        with self._lock:
+            series = self._timings.get(key)
+            if series is None:
+                series = self._timings[key] = _Series()
+            series.window.append(seconds)
+            series.count += 1
+            series.total += seconds
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time the block as `stage`; failures also bump errors_total{stage}."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("errors_total", stage=stage)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_collector(self, name, collect):
+        """
+        Export the numeric values of collect() (e.g. an existing stats()
+        method) as gauges named <name>_<key>, read at export time.
+        """
+        with self._lock:
+            self._collectors[name] = collect
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+    # ---------- export ----------
+    def snapshot(self):
+        """{'stages': {stage: {count, sum, p50, p95, p99}}, 'counters': {...}}; labels are folded into the key."""
+        with self._lock:
+            timings = [(k, list(s.window), s.count, s.total) for k, s in self._timings.items()]
+            counters = dict(self._counters)
+        stages = {}
+        for (stage, labels), window, count, total in timings:
+            window.sort()
+            name = stage + _format_labels(labels)
+            stages[name] = {"count": count, "sum": total}
+            for q in QUANTILES:
+                stages[name][f"p{int(q * 100)}"] = quantile(window, q)
+        return {
+            "stages": stages,
+            "counters": {name + _format_labels(labels): v for (name, labels), v in counters.items()},
+        }
+
+    def _collect(self):
+        with self._lock:
+            collectors = list(self._collectors.items())
+        gauges = []
+        for name, collect in collectors:
+            try:
+                values = collect() or {}
+            except Exception:
+                logger.exception("Metrics collector %s failed", name)
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges.append((f"{name}_{key}", value))
+        return gauges
+
+    def render_prometheus(self):
+        with self._lock:
+            timings = sorted((k, sorted(s.window), s.count, s.total) for k, s in self._timings.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        metric = METRICS_PREFIX + "stage_seconds"
+        if timings:
+            lines.append(f"# HELP {metric} Latency of each request stage in seconds.")
+            lines.append(f"# TYPE {metric} summary")
+        for (stage, labels), window, count, total in timings:
+            series = (("stage", stage),) + labels
+            for q in QUANTILES:
+                lines.append(f"{metric}{_format_labels(series, [('quantile', q)])} {quantile(window, q):.6f}")
+            lines.append(f"{metric}_sum{_format_labels(series)} {total:.6f}")
+            lines.append(f"{metric}_count{_format_labels(series)} {count}")
+        typed = set()
+        for (name, labels), value in counters:
+            metric = METRICS_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        for name, value in self._collect():
+            metric = METRICS_PREFIX + name
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Write the Prometheus text exposition to `path` (atomically)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+
+metrics = MetricsRegistry()
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, registry=metrics):
+    """Serve GET /metrics on `port` from a daemon thread (idempotent; no-op if port is 0)."""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = registry.render_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            _server = ThreadingHTTPServer(("", port), Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
+
+
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def profile_request(name="request", sample_rate=None):
+    """
+    cProfile the block for a sampled fraction of calls (PROFILE_SAMPLE_RATE)
+    and write the stats to PROFILE_DIR/<name>-<timestamp>.prof (open with
+    `python -m pstats` or snakeviz). Only one request is profiled at a time.
+    Yields the output path, or None when this call is not sampled.
+    """
+    rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or random.random() >= rate or not _profile_lock.acquire(blocking=False):
+        yield None
+        return
+    path = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield path
+        finally:
+            profiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(path)
+            logger.info("Wrote profile %s", path)
+    finally:
+        _profile_lock.release()
@@ -1,177 +1,60 @@
 # pdf_utils.py
-
-def create_pdf(resume_content, filename):
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+from metrics import metrics
+from resume_parser import (
+    EMAIL_RE, PHONE_RE, URL_RE, SECTION_ALIASES, CANON_ORDER,
+    normalize_header, is_header, parse_text, parse_resume, section_title,
+)
+
+__all__ = [
+    "LAYOUT_VERSION", "PDF_CACHE_SIZE", "ResumeRenderer", "get_renderer", "create_pdf", "create_pdf_bytes",
+    # parsing moved to resume_parser; re-exported for existing callers
+    "EMAIL_RE", "PHONE_RE", "URL_RE", "SECTION_ALIASES", "CANON_ORDER",
+    "normalize_header", "is_header", "parse_text", "parse_resume", "section_title",
+]
+
+# Bump whenever styles or layout change so cached PDFs are not reused.
+LAYOUT_VERSION = "1"
+# Max number of rendered PDFs kept in memory (per process).
+PDF_CACHE_SIZE = 64
+
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+class ResumeRenderer:
     """
-    Build a clean, fixed resume layout from AI/form text using ReportLab.
-    - Fixed left-aligned contact line
-    - Section headers not forced to UPPERCASE
-    - Robust parsing for 'HEADER: first sentence...' lines
-    - Safer email/phone detection (no C++ false positives)
+    Reusable ReportLab layout engine. Imports, the style sheet and the
+    paragraph styles are set up once in __init__; render() can then be
+    called for many resumes (styles are read-only during doc.build).
     """
-    import re
-    from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, HRFlowable
-    )
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib.enums import TA_LEFT
-    from reportlab.lib import colors
-    import streamlit as st
 
-    try:
-        # ---------- helpers ----------
-        EMAIL_RE = re.compile(r"\b[\w\.-]+@[\w\.-]+\.\w+\b")
-        PHONE_RE = re.compile(r"\+?\d[\d\-\s\(\)]{7,}\d")  # + optional, 9+ digits total
-        URL_RE = re.compile(r"\b(?:https?://|www\.)\S+\b", re.I)
-
-        # Canonical section names & aliases (normalize to keys below)
-        SECTION_ALIASES = {
-            "PROFESSIONAL SUMMARY": "SUMMARY",
-            "SUMMARY": "SUMMARY",
-            "WORK EXPERIENCE": "EXPERIENCE",
-            "EXPERIENCE": "EXPERIENCE",
-            "EDUCATION": "EDUCATION",
-            "SKILLS": "SKILLS",
-            "TECHNICAL SKILLS": "SKILLS",
-            "CORE SKILLS": "SKILLS",
-            "CORE COMPETENCIES": "SKILLS",
-            "CERTIFICATIONS": "CERTIFICATIONS",
-            "PROJECTS": "PROJECTS",
-            "NOTE": "NOTE",
-            "NOTES": "NOTE",
-        }
-        CANON_ORDER = ["SUMMARY", "EXPERIENCE", "EDUCATION", "SKILLS", "CERTIFICATIONS", "PROJECTS", "NOTE"]
-
-        def normalize_header(line):
-            # Detect 'Header: text' or 'Header - text' and split cleanly
-            m = re.match(r"^\s*([A-Za-z\s]+?)\s*[:\-–]\s*(.+)$", line)
-            if m:
-                return m.group(1).strip(), m.group(2).strip()
-            return line.strip(), None
-
-        def is_header(line):
-            hdr, _ = normalize_header(line)
-            return SECTION_ALIASES.get(hdr.upper(), None)
-
-        def parse_text(text):
-            """
-            Returns:
-              name (str or None),
-              contacts (list[str]),
-              sections (dict[str, dict])
-              sections structure:
-                - SUMMARY: {'paras': [..]}
-                - SKILLS: {'lines': [..]}  (preserves 'Category: items' if present)
-                - EXPERIENCE: {'entries': [{'header': 'Job | Company | Dates', 'bullets':[...]}], 'paras':[]}
-                - EDUCATION/CERTIFICATIONS/PROJECTS: {'lines': [...], 'bullets': [...], 'paras': [...]}
-                - NOTE: {'paras': [...]}
-            """
-            lines = [ln.strip() for ln in text.splitlines()]
-            lines = [ln for ln in lines if ln]  # drop blanks
-
-            name = None
-            contacts = []
-            sections = {k: {} for k in CANON_ORDER}
-            for k in sections:
-                sections[k] = {"paras": [], "lines": [], "bullets": [], "entries": []}
-
-            current = None
-            pending_header_text = None  # holds text after "HEADER: text"
-
-            # --- header block (name + contacts) until first section header ---
-            i = 0
-            while i < len(lines):
-                ln = lines[i]
-                canon = is_header(ln)
-                if canon:
-                    # stop header block; process the header line in the main loop below
-                    break
-
-                # first non-empty non-contact line → name (once)
-                if name is None and not EMAIL_RE.search(ln) and not PHONE_RE.search(ln) and not URL_RE.search(ln):
-                    name = ln
-                else:
-                    # contact line: email/phone/url or explicit "Email: ...", "Phone: ..."
-                    if EMAIL_RE.search(ln) or PHONE_RE.search(ln) or URL_RE.search(ln) or re.search(r"(?i)\b(email|phone|linkedin|github)\b", ln):
-                        contacts.append(ln)
-                    else:
-                        # If extra fluff before sections, treat as summary paragraph fallback
-                        sections["SUMMARY"]["paras"].append(ln)
-                i += 1
-
-            # --- main sections ---
-            while i < len(lines):
-                ln = lines[i]
-                canon = is_header(ln)
-                if canon:
-                    # set current canonical section
-                    hdr, after = normalize_header(ln)
-                    current = SECTION_ALIASES[hdr.upper()]
-                    pending_header_text = after  # if "HEADER: text" capture the text as first para
-                    i += 1
-                    continue
-
-                if current is None:
-                    # no recognized header yet; treat as summary
-                    sections["SUMMARY"]["paras"].append(ln)
-                    i += 1
-                    continue
-
-                # add the text that followed a "HEADER: text" line as first paragraph
-                if pending_header_text:
-                    sections[current]["paras"].append(pending_header_text)
-                    pending_header_text = None
-
-                # bullets
-                if ln.startswith(("•", "-", "*")):
-                    sections[current]["bullets"].append(ln.lstrip("•-* ").strip())
-                    i += 1
-                    continue
-
-                # Experience: detect "Role | Company | Dates"
-                if current == "EXPERIENCE" and "|" in ln:
-                    parts = [p.strip() for p in ln.split("|")]
-                    # Allow 2 or 3 parts
-                    if len(parts) == 3:
-                        header = f"{parts[0]} | {parts[1]} — {parts[2]}"
-                    elif len(parts) == 2:
-                        header = f"{parts[0]} — {parts[1]}"
-                    else:
-                        header = " | ".join(parts)
-                    sections[current]["entries"].append({"header": header, "bullets": []})
-                    i += 1
-                    # consume following bullets for this entry
-                    while i < len(lines) and lines[i].strip().startswith(("•", "-", "*")):
-                        sections[current]["entries"][-1]["bullets"].append(lines[i].strip().lstrip("•-* ").strip())
-                        i += 1
-                    continue
-
-                # Skills: keep 'Category: items' as lines; otherwise comma list
-                if current == "SKILLS":
-                    sections[current]["lines"].append(ln)
-                    i += 1
-                    continue
-
-                # default: paragraph or line
-                sections[current]["paras"].append(ln)
-                i += 1
-
-            return name, contacts, sections
-
-        # ---------- document + styles ----------
-        doc = SimpleDocTemplate(
-            filename,
-            pagesize=letter,
-            topMargin=0.5 * inch,
-            bottomMargin=0.5 * inch,
-            leftMargin=0.75 * inch,
-            rightMargin=0.75 * inch,
+    def __init__(self):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import (
+            SimpleDocTemplate, Paragraph, Spacer, HRFlowable
         )
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.lib.enums import TA_LEFT
+        from reportlab.lib import colors
+
+        self._SimpleDocTemplate = SimpleDocTemplate
+        self._Paragraph = Paragraph
+        self._Spacer = Spacer
+        self._HRFlowable = HRFlowable
+        self._pagesize = letter
+        self._inch = inch
+        self._divider_color = colors.HexColor("#e5e7eb")
+
         styles = getSampleStyleSheet()
 
         # Base body text
-        body = ParagraphStyle(
+        self.body = ParagraphStyle(
             "Body",
             parent=styles["Normal"],
             fontName="Helvetica",
@@ -182,7 +65,7 @@ def create_pdf(resume_content, filename):
             spaceAfter=4,
         )
         # Name (left-aligned, bigger)
-        name_style = ParagraphStyle(
+        self.name_style = ParagraphStyle(
             "Name",
             parent=styles["Title"],
             fontName="Helvetica-Bold",
@@ -193,7 +76,7 @@ def create_pdf(resume_content, filename):
             spaceAfter=2,
         )
         # Contact line (left, small)
-        contact_style = ParagraphStyle(
+        self.contact_style = ParagraphStyle(
             "Contact",
             parent=styles["Normal"],
             fontName="Helvetica",
@@ -204,7 +87,7 @@ def create_pdf(resume_content, filename):
             spaceAfter=8,
         )
         # Section header (no forced UPPERCASE)
-        section_header = ParagraphStyle(
+        self.section_header = ParagraphStyle(
             "SectionHeader",
             parent=styles["Heading2"],
             fontName="Helvetica-Bold",
@@ -215,15 +98,15 @@ def create_pdf(resume_content, filename):
             spaceAfter=4,
         )
         # Bullet body
-        bullet = ParagraphStyle(
+        self.bullet = ParagraphStyle(
             "Bullet",
-            parent=body,
+            parent=self.body,
             leftIndent=16,
             bulletIndent=8,
             spaceAfter=2,
         )
         # Experience entry header
-        job_header = ParagraphStyle(
+        self.job_header = ParagraphStyle(
             "JobHeader",
             parent=styles["Normal"],
             fontName="Helvetica-Bold",
@@ -234,7 +117,7 @@ def create_pdf(resume_content, filename):
             spaceAfter=2,
         )
         # Note style (small, italic, not bold/caps)
-        note_style = ParagraphStyle(
+        self.note_style = ParagraphStyle(
             "Note",
             parent=styles["Normal"],
             fontName="Helvetica-Oblique",
@@ -245,96 +128,187 @@ def create_pdf(resume_content, filename):
             spaceBefore=8,
         )
 
-        # ---------- build content ----------
-        name, contacts, sections = parse_text(resume_content)
+    def build_story(self, name, contacts, sections):
+        Paragraph, Spacer = self._Paragraph, self._Spacer
+        body, bullet = self.body, self.bullet
         story = []
 
         # Name
         if name:
-            story.append(Paragraph(name, name_style))
-        # Contact — join with separators, left-aligned
+            story.append(Paragraph(name, self.name_style))
+        # Contact — join with separators, left-aligned (deduplicated, order kept)
         if contacts:
-            # Deduplicate and keep order
-            seen = set()
-            clean = []
-            for c in contacts:
-                if c not in seen:
-                    seen.add(c)
-                    clean.append(c)
-            story.append(Paragraph("  |  ".join(clean), contact_style))
+            story.append(Paragraph("  |  ".join(dict.fromkeys(contacts)), self.contact_style))
 
         # Subtle divider
-        story.append(HRFlowable(width="100%", thickness=0.6, color=colors.HexColor("#e5e7eb")))
+        story.append(self._HRFlowable(width="100%", thickness=0.6, color=self._divider_color))
         story.append(Spacer(1, 6))
 
         # Sections in fixed order for consistent template
         for key in CANON_ORDER:
             sec = sections.get(key)
+            # Skip sections without content
             if not sec:
                 continue
-            # Decide if section has any content
-            has_content = any([sec["paras"], sec["lines"], sec["bullets"], sec["entries"]])
-            if not has_content:
-                continue
 
             # Header (as-is, not uppercased)
-            story.append(Paragraph(key.title() if key != "NOTE" else "Note", section_header))
+            story.append(Paragraph(section_title(key), self.section_header))
 
             # Render by type
             if key == "SUMMARY":
-                for p in sec["paras"]:
+                for p in sec.paras:
                     story.append(Paragraph(p, body))
 
             elif key == "EXPERIENCE":
                 # Structured entries if present
-                if sec["entries"]:
-                    for entry in sec["entries"]:
-                        story.append(Paragraph(entry["header"], job_header))
-                        for btxt in entry["bullets"]:
+                if sec.entries:
+                    for entry in sec.entries:
+                        story.append(Paragraph(entry.header, self.job_header))
+                        for btxt in entry.bullets:
                             story.append(Paragraph(f"• {btxt}", bullet))
                 # Any extra bullets outside structured entries
-                for btxt in sec["bullets"]:
+                for btxt in sec.bullets:
                     story.append(Paragraph(f"• {btxt}", bullet))
                 # Any paras that weren't captured
-                for p in sec["paras"]:
+                for p in sec.paras:
                     story.append(Paragraph(p, body))
 
             elif key == "SKILLS":
                 # Prefer categorized lines like "Languages: Python, Java"
-                if sec["lines"]:
-                    for ln in sec["lines"]:
+                if sec.lines:
+                    for ln in sec.lines:
                         if ":" in ln:
                             cat, items = ln.split(":", 1)
                             story.append(Paragraph(f"<b>{cat.strip()}:</b> {items.strip()}", body))
                         else:
                             story.append(Paragraph(ln, body))
                 # Or bullets
-                for btxt in sec["bullets"]:
+                for btxt in sec.bullets:
                     story.append(Paragraph(f"• {btxt}", bullet))
-                for p in sec["paras"]:
+                for p in sec.paras:
                     story.append(Paragraph(p, body))
 
             elif key in ("EDUCATION", "CERTIFICATIONS", "PROJECTS"):
                 # Print lines first (often 'Degree | School | Year')
-                for ln in sec["lines"]:
+                for ln in sec.lines:
                     story.append(Paragraph(ln, body))
-                for btxt in sec["bullets"]:
+                for btxt in sec.bullets:
                     story.append(Paragraph(f"• {btxt}", bullet))
-                for p in sec["paras"]:
+                for p in sec.paras:
                     story.append(Paragraph(p, body))
 
             elif key == "NOTE":
                 # Only light, italic, not bold/caps
-                for p in sec["paras"]:
-                    story.append(Paragraph(p, note_style))
+                for p in sec.paras:
+                    story.append(Paragraph(p, self.note_style))
 
             # small spacing after each section
             story.append(Spacer(1, 4))
 
-        # ---------- build PDF ----------
-        doc.build(story)
+        return story
+
+    def render(self, resume_content, filename, parsed=None):
+        """
+        Render resume text to `filename` (a path or writable binary file).
+        Pass `parsed` (a ParsedResume) to skip parsing again, e.g. when a
+        ResumeParser already consumed the streamed text.
+        """
+        self.render_parsed(parsed if parsed is not None else parse_resume(resume_content), filename)
+
+    def render_parsed(self, parsed, filename):
+        inch = self._inch
+        doc = self._SimpleDocTemplate(
+            filename,
+            pagesize=self._pagesize,
+            topMargin=0.5 * inch,
+            bottomMargin=0.5 * inch,
+            leftMargin=0.75 * inch,
+            rightMargin=0.75 * inch,
+        )
+        name, contacts, sections = parsed
+        with metrics.span("pdf_build"):
+            doc.build(self.build_story(name, contacts, sections))
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """Process-wide ResumeRenderer, built on first use."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ResumeRenderer()
+    return _renderer
+
+
+def create_pdf(resume_content, filename, parsed=None):
+    """
+    Build a clean, fixed resume layout from AI/form text using ReportLab.
+    - `filename` may be a path or a writable binary file-like object
+    - Fixed left-aligned contact line
+    - Section headers not forced to UPPERCASE
+    - Robust parsing for 'HEADER: first sentence...' lines
+    - Safer email/phone detection (no C++ false positives)
+    """
+    import streamlit as st
+
+    try:
+        get_renderer().render(resume_content, filename, parsed)
         return True
 
     except Exception as e:
         st.error(f"Error creating PDF: {str(e)}")
         return False
+
+
+def _pdf_cache_key(resume_content):
+    digest = hashlib.sha256()
+    digest.update(LAYOUT_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(resume_content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def create_pdf_bytes(resume_content, parsed=None):
+    """
+    Render the resume into an in-memory buffer and return the PDF bytes
+    (None on failure). Rendered PDFs are kept in a bounded LRU keyed by a
+    hash of the content plus LAYOUT_VERSION, so reruns skip ReportLab.
+    Renders run on the shared RenderPool when RENDER_WORKERS is set.
+    """
+    key = _pdf_cache_key(resume_content)
+    with _pdf_cache_lock:
+        pdf_bytes = _pdf_cache.get(key)
+        if pdf_bytes is not None:
+            _pdf_cache.move_to_end(key)
+            metrics.inc("cache_requests_total", cache="pdf", result="hit")
+            return pdf_bytes
+    metrics.inc("cache_requests_total", cache="pdf", result="miss")
+
+    from render_pool import get_shared_pool
+    pool = get_shared_pool()
+    if pool is not None:
+        import streamlit as st
+        try:
+            with metrics.span("pdf_render", where="pool"):
+                pdf_bytes = pool.render(parsed if parsed is not None else resume_content)
+        except Exception as e:
+            st.error(f"Error creating PDF: {str(e)}")
+            return None
+    else:
+        buffer = io.BytesIO()
+        with metrics.span("pdf_render", where="inline"):
+            ok = create_pdf(resume_content, buffer, parsed)
+        if not ok:
+            return None
+        pdf_bytes = buffer.getvalue()
+
+    with _pdf_cache_lock:
+        _pdf_cache[key] = pdf_bytes
+        _pdf_cache.move_to_end(key)
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)
+    return pdf_bytes
@@ -0,0 +1,143 @@
+# prompt_builder.py
+"""
+Assembles the generation prompt from prompt_templates.STATIC_PREFIX (kept
+byte-stable for provider-side prompt caching) and the per-request parts,
+counting tokens per part and trimming the retrieved template context to
+a token budget.
+"""
+import logging
+import os
+import threading
+
+from prompt_templates import STATIC_PREFIX, DYNAMIC_TEMPLATE, SECTION_TEMPLATE
+from resume_parser import section_heading
+
+# Max tokens of retrieved template text injected into a prompt
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "1500"))
+# Used when no template matches the job field
+DEFAULT_CONTEXT = "Generic resume template."
+
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """tiktoken encoding for the chat model, or None if tiktoken is unavailable."""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception:
+                    _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text):
+    enc = get_encoding()
+    if enc is None:
+        return max(1, len(text) // 4) if text else 0
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def trim_to_tokens(text, budget):
+    """Cut `text` to at most `budget` tokens, preferring a line boundary."""
+    if count_tokens(text) <= budget:
+        return text
+    enc = get_encoding()
+    if enc is None:
+        cut = text[:budget * 4]
+    else:
+        cut = enc.decode(enc.encode(text, disallowed_special=())[:budget])
+    newline = cut.rfind("\n")
+    return cut[:newline] if newline > len(cut) // 2 else cut
+
+
+class BuiltPrompt:
+    """Prompt text plus its per-part token counts."""
+    __slots__ = ("text", "token_counts", "context_trimmed")
+
+    def __init__(self, text, token_counts, context_trimmed):
+        self.text = text
+        self.token_counts = token_counts
+        self.context_trimmed = context_trimmed
+
+    @property
+    def input_tokens(self):
+        return sum(self.token_counts.values())
+
+
+class PromptBuilder:
+    """Builds prompts as STATIC_PREFIX + per-request suffix."""
+
+    def __init__(self, context_budget=PROMPT_CONTEXT_TOKENS):
+        self.context_budget = context_budget
+        self.prefix_tokens = count_tokens(STATIC_PREFIX)
+
+    def _finish(self, suffix, trimmed, context):
+        counts = {
+            "static": self.prefix_tokens,
+            "context": count_tokens(trimmed),
+            "dynamic": count_tokens(suffix) - count_tokens(trimmed),
+        }
+        return BuiltPrompt(STATIC_PREFIX + suffix, counts, trimmed is not context)
+
+    def build(self, user_details, job_field, context=None):
+        context = (context or DEFAULT_CONTEXT).strip()
+        trimmed = trim_to_tokens(context, self.context_budget)
+        suffix = DYNAMIC_TEMPLATE.format(job_field=job_field, context=trimmed, user_details=user_details)
+        return self._finish(suffix, trimmed, context)
+
+    def build_section(self, key, job_field, context=None, user_details=None, current=None, instructions=None):
+        """
+        Prompt for writing only section `key`: `context` is the reference
+        template's text for that section, `current` the section's existing
+        text (rewritten when given, written from scratch otherwise).
+        """
+        heading = section_heading(key)
+        context = (context or "(none)").strip()
+        trimmed = trim_to_tokens(context, self.context_budget)
+        if current:
+            task = f"Rewrite ONLY the {heading} section above."
+        else:
+            task = f"Write ONLY the {heading} section of this person's resume."
+        if instructions:
+            task += f" Follow these instructions: {instructions.strip()}"
+        suffix = SECTION_TEMPLATE.format(
+            job_field=job_field, heading=heading, context=trimmed,
+            user_details=(user_details or "(not provided)").strip(),
+            current=(current or "(none)").strip(), task=task,
+        )
+        return self._finish(suffix, trimmed, context)
+
+
+def usage_tokens(usage):
+    """(input, output, cached input) tokens from a LangChain usage_metadata dict."""
+    if not usage:
+        return None, None, None
+    details = usage.get("input_token_details") or {}
+    return usage.get("input_tokens"), usage.get("output_tokens"), details.get("cache_read")
+
+
+def log_usage(prompt, usage=None, output_text=None, job_field=None):
+    """
+    Log token counts for one request. Provider-reported usage wins; output
+    tokens are counted locally when the provider did not report them.
+    """
+    input_tokens, output_tokens, cached_tokens = usage_tokens(usage)
+    if input_tokens is None:
+        input_tokens = prompt.input_tokens
+    if output_tokens is None and output_text is not None:
+        output_tokens = count_tokens(output_text)
+    logger.info(
+        "LLM request field=%r input_tokens=%s (static=%s context=%s dynamic=%s%s) "
+        "cached_input_tokens=%s output_tokens=%s",
+        job_field, input_tokens, prompt.token_counts["static"], prompt.token_counts["context"],
+        prompt.token_counts["dynamic"], ", context trimmed" if prompt.context_trimmed else "",
+        cached_tokens, output_tokens,
+    )
+    return input_tokens, output_tokens
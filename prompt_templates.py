@@ -1,6 +1,13 @@
 from langchain_core.prompts import PromptTemplate
 
-prompt_template = """
+# Bump whenever prompt_template changes so cached generations are not reused.
+PROMPT_VERSION = "2"
+
+# Everything up to the first per-request value is byte-identical across
+# requests so the provider can reuse its prompt cache; per-request parts
+# follow, least-varying first (the field's reference template is shared by
+# everyone targeting that field).
+STATIC_PREFIX = """
 You are a world-class, professional resume writer specializing in creating Applicant Tracking System (ATS)-friendly resumes.
 
 Your task:
@@ -63,12 +70,6 @@ Certification Name | Organization | Year
 
 ===== END OF FORMAT EXAMPLE =====
 
-USER INPUT:
-{user_details}
-
-TARGET JOB FIELD:
-{job_field}
-
 INSTRUCTIONS:
 1. For any missing details, infer plausible entries aligned with the target job field, keeping them general but professional.
 2. Maintain consistent formatting, especially dates and punctuation.
@@ -77,10 +78,69 @@ INSTRUCTIONS:
 5. The final resume must be ATS-friendly (plain text), no special formatting except all caps for section titles.
 6. Be concise — no bullet should exceed two lines.
 
+Use the REFERENCE TEMPLATE below (if any) for the tone, vocabulary and typical achievements of the target field; never copy its names or personal details.
+
+"""
+
+DYNAMIC_TEMPLATE = """TARGET JOB FIELD:
+{job_field}
+
+REFERENCE TEMPLATE:
+{context}
+
+USER INPUT:
+{user_details}
+
 Return only the completed resume, with no explanations.
 """
 
+prompt_template = STATIC_PREFIX + DYNAMIC_TEMPLATE
+
+# Per-request part for writing a single section; shares STATIC_PREFIX (and
+# so the provider's prompt cache) with full generations.
+SECTION_TEMPLATE = """TARGET JOB FIELD:
+{job_field}
+
+REFERENCE TEMPLATE ({heading} SECTION):
+{context}
+
+USER INPUT:
+{user_details}
+
+CURRENT {heading} SECTION:
+{current}
+
+TASK:
+{task}
+Start with the line "{heading}", follow the format example above for this section only, and return nothing else.
+"""
+
 prompt = PromptTemplate(
     template=prompt_template,
     input_variables=["user_details", "job_field", "context"]
 )
+
+
+USER_DETAIL_LABELS = ("name", "email", "phone", "education", "experience", "skills")
+
+
+def user_detail_fields(user_details):
+    """Inverse of format_user_details: {"name": ..., "email": ..., ...}."""
+    fields = {}
+    for line in user_details.splitlines():
+        label, sep, value = line.strip().partition(":")
+        if sep and label.lower() in USER_DETAIL_LABELS:
+            fields[label.lower()] = value.strip()
+    return fields
+
+
+def format_user_details(name, email, phone, education, experience, skills):
+    """The USER INPUT block sent to the model, as built from the form fields."""
+    return f"""
+            Name: {name}
+            Email: {email}
+            Phone: {phone}
+            Education: {education}
+            Experience: {experience}
+            Skills: {skills}
+            """
@@ -0,0 +1,99 @@
+# render_pool.py
+"""
+Off-thread PDF rendering on a pool of pre-warmed worker processes.
+
+ReportLab's doc.build is pure Python and holds the GIL, so renders on the
+Streamlit script threads serialize every session. RenderPool moves them to
+worker processes that have already imported ReportLab, built the shared
+ResumeRenderer and rendered once (loading the fonts).
+
+Set RENDER_WORKERS=N to make create_pdf_bytes use a shared pool of N
+workers; the default (0) keeps rendering in-process.
+"""
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "0"))
+# "spawn" is safe from inside the multi-threaded Streamlit server
+START_METHOD = os.getenv("RENDER_START_METHOD", "spawn")
+
+_WARMUP_TEXT = "Warm Up\nwarm@up.io\nSUMMARY\nWarm-up render.\nSKILLS\nFonts: loaded"
+
+
+def _init_worker():
+    from pdf_utils import get_renderer
+    from resume_parser import parse_resume
+    get_renderer().render_parsed(parse_resume(_WARMUP_TEXT), io.BytesIO())
+
+
+def _ping(delay):
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _render(resume):
+    """Worker task: resume text or ParsedResume -> PDF bytes."""
+    from pdf_utils import get_renderer
+    from resume_parser import parse_resume
+    parsed = parse_resume(resume) if isinstance(resume, str) else resume
+    buffer = io.BytesIO()
+    get_renderer().render_parsed(parsed, buffer)
+    return buffer.getvalue()
+
+
+class RenderPool:
+    """Process pool rendering resumes (text or ParsedResume) to PDF bytes."""
+
+    def __init__(self, workers=None, start_method=START_METHOD, warm=True):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+        )
+        if warm:
+            self.warm_up()
+
+    def warm_up(self):
+        # Workers start lazily; give each one a task so all are spawned and initialized now.
+        return set(self._executor.map(_ping, [0.05] * self.workers))
+
+    def submit(self, resume):
+        """Queue one resume; returns a Future resolving to PDF bytes."""
+        return self._executor.submit(_render, resume)
+
+    def render(self, resume):
+        return self.submit(resume).result()
+
+    def map(self, resumes, chunksize=1):
+        """Render many resumes; yields PDF bytes in input order."""
+        return self._executor.map(_render, resumes, chunksize=chunksize)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool():
+    """Process-wide pool sized by RENDER_WORKERS, or None when disabled."""
+    global _shared_pool
+    if RENDER_WORKERS <= 0:
+        return None
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = RenderPool(RENDER_WORKERS)
+    return _shared_pool
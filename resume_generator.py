@@ -1,34 +1,350 @@
+import time
 import streamlit as st
-from config import llm, embeddings
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from config import get_llm, get_embeddings, MODEL_NAME, GENERATION_MODE
 from vectorstore import initialize_vectorstore
-from prompt_templates import prompt_template
+from prompt_templates import PROMPT_VERSION, user_detail_fields
+from prompt_builder import PromptBuilder, log_usage
+from generation_cache import GenerationCache, request_fingerprint
+from retrieval import TemplateRetriever
+from singleflight import LeaderAbandoned, SingleFlight
+from metrics import metrics
+from resume_parser import (
+    CANON_ORDER, ParsedResume, Section, extract_section, is_header, parse_resume, parse_text,
+    section_heading, splice_section,
+)
 
-vectorstore = initialize_vectorstore(embeddings)
+logger = logging.getLogger(__name__)
+
+# Sections written by their own concurrent call in "sections" mode
+PARALLEL_SECTIONS = ("SUMMARY", "EXPERIENCE", "EDUCATION", "SKILLS", "PROJECTS", "CERTIFICATIONS")
+REQUIRED_SECTIONS = ("SUMMARY", "EXPERIENCE", "EDUCATION", "SKILLS")
+OPTIONAL_SECTION_NOTE = "Include it only if relevant to the target role; otherwise return just the heading."
 
 @st.cache_resource
-def setup_custom_chain(_llm, _vectorstore, _embeddings):
+def setup_template_retriever(_vectorstore, _embeddings):
     try:
-        retriever = _vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 1})
-        return retriever
+        return TemplateRetriever(_vectorstore, _embeddings)
     except Exception as e:
         st.error(f"Failed to initialize retriever: {str(e)}")
         st.stop()
 
-retriever = setup_custom_chain(llm, vectorstore, embeddings)
+def get_retriever():
+    # Built on first request rather than at import; loading a saved index
+    # does not load the embedding model (see config.LazyEmbeddings).
+    embeddings = get_embeddings()
+    return setup_template_retriever(initialize_vectorstore(embeddings), embeddings)
 
-def generate_resume_content(user_details, job_field):
+@st.cache_resource
+def get_generation_cache():
     try:
-        query = f"Resume template for {job_field}"
-        docs = retriever.get_relevant_documents(query)
-        template_content = docs[0].page_content if docs else "Generic resume template."
-
-        formatted_prompt = prompt_template.format(
-            user_details=user_details,
-            job_field=job_field,
-            context=template_content
-        )
-        response = llm.invoke(formatted_prompt)
+        return GenerationCache()
+    except Exception as e:
+        st.warning(f"Generation cache unavailable: {e}")
+        return None
+
+generation_cache = get_generation_cache()
+
+generation_flights = SingleFlight()
+
+if generation_cache is not None:
+    metrics.register_collector("generation_cache", generation_cache.stats)
+metrics.register_collector("generation_flights", generation_flights.stats)
+
+prompt_builder = PromptBuilder()
+
+def _cache_key(user_details, job_field, mode="single"):
+    version = PROMPT_VERSION if mode == "single" else f"{PROMPT_VERSION}-{mode}"
+    return request_fingerprint(user_details, job_field, version, MODEL_NAME)
+
+def _build_prompt(user_details, job_field):
+    """BuiltPrompt with the retrieved template injected as context."""
+    with metrics.span("retrieval"):
+        doc = get_retriever().get_template(job_field)
+    with metrics.span("prompt_build"):
+        return prompt_builder.build(user_details, job_field, doc.page_content if doc else None)
+
+def _template_section(job_field, key):
+    """Section `key` of the field's reference template, if it has one."""
+    with metrics.span("retrieval"):
+        doc = get_retriever().get_template(job_field)
+    return extract_section(doc.page_content, key) if doc else None
+
+def _section_block(text, key):
+    """Keep only section `key` of a model reply, making sure it starts with its heading."""
+    # a section reply has no name/contact preamble: text before its first heading is chatter
+    lines = text.splitlines(keepends=True)
+    first = next((i for i, line in enumerate(lines) if line.strip() and is_header(line.strip())), None)
+    block = extract_section("".join(lines[first:]), key) if first is not None else None
+    if block is None:
+        block = f"{section_heading(key)}\n{text.strip()}"
+    return block
+
+def _write_section(key, user_details, job_field, context, tokens):
+    """One section block from its own LLM call (None for an empty optional section)."""
+    prompt = prompt_builder.build_section(
+        key, job_field, context=context, user_details=user_details,
+        instructions=None if key in REQUIRED_SECTIONS else OPTIONAL_SECTION_NOTE,
+    )
+    for attempt in range(2):
+        with metrics.span("llm", mode="section"):
+            response = get_llm().invoke(prompt.text)
+        input_tokens, output_tokens = log_usage(
+            prompt, getattr(response, "usage_metadata", None), response.content, job_field)
+        tokens["input"] = tokens.get("input", 0) + (input_tokens or 0)
+        tokens["output"] = tokens.get("output", 0) + (output_tokens or 0)
+        block = _section_block(response.content, key)
+        if parse_resume(block).sections.get(key):
+            return block
+        if key not in REQUIRED_SECTIONS:
+            return None
+        logger.warning("Model returned an empty %s section (attempt %d)", key, attempt + 1)
+    raise ValueError(f"Model returned no {section_heading(key).title()} section")
+
+def _header_block(user_details):
+    fields = user_detail_fields(user_details)
+    # Labeled so the parser files short phone numbers under contacts, not SUMMARY
+    lines = [fields["name"]] if fields.get("name") else []
+    lines += [f"{label}: {fields[key]}" for key, label in (("email", "Email"), ("phone", "Phone")) if fields.get(key)]
+    return "\n".join(lines)
+
+def _check_format(content):
+    """Make sure the merged text parses into name, contacts and every required section."""
+    name, contacts, sections = parse_text(content)
+    missing = [k for k in REQUIRED_SECTIONS if not sections.get(k)]
+    if not name or not contacts or missing:
+        raise ValueError(f"Merged resume is missing: {', '.join(missing or ['name/contacts'])}")
+
+def _generate_sections(user_details, job_field, tokens):
+    """
+    Yield the resume piece by piece: the header (built from the form, no
+    LLM call), then each section in CANON_ORDER as soon as it and every
+    section before it are done. All section calls run concurrently and
+    share STATIC_PREFIX. Token counts are summed into `tokens`.
+    """
+    with metrics.span("retrieval"):
+        doc = get_retriever().get_template(job_field)
+    template = doc.page_content if doc else ""
+    keys = [k for k in CANON_ORDER if k in PARALLEL_SECTIONS]
+    with ThreadPoolExecutor(max_workers=len(keys), thread_name_prefix="section") as pool:
+        futures = {
+            key: pool.submit(_write_section, key, user_details, job_field,
+                             extract_section(template, key) if template else None, tokens)
+            for key in keys
+        }
+        yield _header_block(user_details) + "\n"
+        for key in keys:
+            block = futures[key].result()
+            if block:
+                yield "\n" + block + "\n"
+
+def _invoke_sections(key, user_details, job_field):
+    tokens = {}
+    start = time.perf_counter()
+    try:
+        content = "".join(_generate_sections(user_details, job_field, tokens))
+        _check_format(content)
+    finally:
+        # Not a span: callers already count the failure in errors_total{stage="generate"}
+        metrics.observe("generate", time.perf_counter() - start, mode="sections")
+    _store(key, content)
+    return content
+
+def _cached(key):
+    return generation_cache.get(key) if generation_cache is not None else None
+
+def _store(key, content):
+    if generation_cache is not None:
+        generation_cache.set(key, content)
+
+def _invoke(key, user_details, job_field):
+    prompt = _build_prompt(user_details, job_field)
+    with metrics.span("llm"):
+        response = get_llm().invoke(prompt.text)
+    log_usage(prompt, getattr(response, "usage_metadata", None), response.content, job_field)
+    _store(key, response.content)
+    return response.content
+
+def generate_resume_content(user_details, job_field, mode=None):
+    """
+    Resume text for the form input, or None after st.error on failure.
+    mode is "single" (one LLM call) or "sections" (concurrent per-section
+    calls, see _generate_sections); defaults to config.GENERATION_MODE.
+    """
+    mode = mode or GENERATION_MODE
+    try:
+        key = _cache_key(user_details, job_field, mode)
+        cached = _cached(key)
+        if cached is not None:
+            return cached
+        invoke = _invoke_sections if mode == "sections" else _invoke
+        # Identical concurrent requests (double clicks, several tabs) share one LLM call
+        return generation_flights.do(key, lambda: invoke(key, user_details, job_field))
+    except Exception as e:
+        metrics.inc("errors_total", stage="generate")
+        st.error(f"Error generating resume: {str(e)}")
+        return None
+
+async def agenerate_resume_content(user_details, job_field, raise_errors=False, mode=None):
+    """
+    Async variant of generate_resume_content (same prompt, retrieval,
+    cache and single-flight) built on llm.ainvoke, for batch jobs. With
+    raise_errors=True failures propagate instead of being reported through
+    st.error. "sections" mode runs its section calls on worker threads.
+    """
+    mode = mode or GENERATION_MODE
+
+    async def ainvoke():
+        if mode == "sections":
+            return await asyncio.to_thread(_invoke_sections, key, user_details, job_field)
+        prompt = _build_prompt(user_details, job_field)
+        with metrics.span("llm"):
+            response = await get_llm().ainvoke(prompt.text)
+        log_usage(prompt, getattr(response, "usage_metadata", None), response.content, job_field)
+        _store(key, response.content)
         return response.content
+
+    try:
+        key = _cache_key(user_details, job_field, mode)
+        cached = _cached(key)
+        if cached is not None:
+            return cached
+        return await generation_flights.ado(key, ainvoke)
     except Exception as e:
+        metrics.inc("errors_total", stage="generate")
+        if raise_errors:
+            raise
         st.error(f"Error generating resume: {str(e)}")
         return None
+
+def _stream_single(user_details, job_field, tokens):
+    prompt = _build_prompt(user_details, job_field)
+    llm_start = time.perf_counter()
+    usage = None
+    chunks = []
+    for chunk in get_llm().stream(prompt.text):
+        # with stream_usage the final chunk carries the token usage
+        if getattr(chunk, "usage_metadata", None):
+            usage = chunk.usage_metadata
+        if not chunk.content:
+            continue
+        if not chunks:
+            metrics.observe("llm_first_token", time.perf_counter() - llm_start)
+        chunks.append(chunk.content)
+        yield chunk.content
+    metrics.observe("llm", time.perf_counter() - llm_start)
+    tokens["input"], tokens["output"] = log_usage(prompt, usage, "".join(chunks), job_field)
+
+def stream_resume_content(user_details, job_field, stats=None, mode=None):
+    """
+    Yield the resume text in chunks as the model streams it (in "sections"
+    mode: the header, then whole sections in order as they complete).
+    If `stats` (a dict) is given it is filled with 'ttft' (seconds to first
+    token), 'total' (seconds for the whole generation), 'cached' (served
+    from the generation cache), 'coalesced' (shared an identical in-flight
+    generation), 'ok' (False if generation failed part-way, in which
+    case the text is incomplete) and, for fresh generations,
+    'input_tokens' / 'output_tokens'.
+    """
+    stats = {} if stats is None else stats
+    stats["ok"] = False
+    stats["cached"] = False
+    stats["coalesced"] = False
+    mode = mode or GENERATION_MODE
+    start = time.perf_counter()
+    try:
+        key = _cache_key(user_details, job_field, mode)
+        cached = _cached(key)
+        if cached is not None:
+            stats["cached"] = True
+            stats["ttft"] = time.perf_counter() - start
+            yield cached
+            stats["ok"] = True
+            return
+
+        while True:
+            call, leader = generation_flights.join(key)
+            if leader:
+                break
+            # Another session is generating the same resume; wait and share it
+            try:
+                content = call.wait()
+            except LeaderAbandoned:
+                continue  # its session went away mid-stream; generate it ourselves
+            stats["coalesced"] = True
+            stats["ttft"] = time.perf_counter() - start
+            yield content
+            stats["ok"] = True
+            return
+
+        chunks = []
+        tokens = {}
+        source = _generate_sections if mode == "sections" else _stream_single
+        try:
+            for text in source(user_details, job_field, tokens):
+                if "ttft" not in stats:
+                    stats["ttft"] = time.perf_counter() - start
+                chunks.append(text)
+                yield text
+            content = "".join(chunks)
+            if mode == "sections":
+                _check_format(content)
+        except BaseException as e:
+            # GeneratorExit (consumer stopped early) reaches followers as LeaderAbandoned
+            generation_flights.finish(key, call, error=e)
+            raise
+        generation_flights.finish(key, call, result=content)
+        stats["input_tokens"], stats["output_tokens"] = tokens.get("input"), tokens.get("output")
+        stats["ok"] = True
+        _store(key, content)
+    except Exception as e:
+        metrics.inc("errors_total", stage="generate")
+        st.error(f"Error generating resume: {str(e)}")
+    finally:
+        stats["total"] = time.perf_counter() - start
+
+def regenerate_section(resume_content, key, job_field, instructions=None, user_details=None, parsed=None):
+    """
+    Rewrite one canonical section (a CANON_ORDER key) of an existing resume.
+    Only that section's current text and the matching section of the
+    field's reference template are sent to the model, so the rest of the
+    document is not paid for again.
+
+    Returns (content, parsed, changed): the spliced text, the ParsedResume
+    with only that section replaced, and whether the section changed. When
+    changed is False the inputs are returned as-is and nothing needs to be
+    re-rendered (create_pdf_bytes would also hit its cache). Returns None
+    on failure, after reporting it with st.error.
+    """
+    if key not in CANON_ORDER:
+        raise ValueError(f"Unknown section: {key!r} (expected one of {', '.join(CANON_ORDER)})")
+    try:
+        if parsed is None:
+            parsed = parse_resume(resume_content)
+        prompt = prompt_builder.build_section(
+            key, job_field, context=_template_section(job_field, key), user_details=user_details,
+            current=extract_section(resume_content, key), instructions=instructions,
+        )
+        with metrics.span("llm", mode="section"):
+            response = get_llm().invoke(prompt.text)
+        log_usage(prompt, getattr(response, "usage_metadata", None), response.content, job_field)
+
+        block = _section_block(response.content, key)
+        section = parse_resume(block).sections.get(key) or Section()
+        if section == (parsed.sections.get(key) or Section()):
+            metrics.inc("section_regenerations_total", section=key, changed="false")
+            return resume_content, parsed, False
+
+        sections = dict(parsed.sections)
+        if section:
+            sections[key] = section
+        else:
+            sections.pop(key, None)
+        metrics.inc("section_regenerations_total", section=key, changed="true")
+        return splice_section(resume_content, key, block), ParsedResume(parsed.name, parsed.contacts, sections), True
+    except Exception as e:
+        metrics.inc("errors_total", stage="regenerate_section")
+        st.error(f"Error regenerating {section_heading(key).title()}: {str(e)}")
+        return None
@@ -0,0 +1,445 @@
+# resume_parser.py
+import json
+import marshal
+import re
+import sys
+
+from metrics import metrics
+
+# ---------- helpers ----------
+EMAIL_RE = re.compile(r"\b[\w\.-]+@[\w\.-]+\.\w+\b")
+PHONE_RE = re.compile(r"\+?\d[\d\-\s\(\)]{7,}\d")  # + optional, 9+ digits total
+URL_RE = re.compile(r"\b(?:https?://|www\.)\S+\b", re.I)
+HEADER_RE = re.compile(r"^\s*([A-Za-z\s]+?)\s*[:\-–]\s*(.+)$")
+CONTACT_LABEL_RE = re.compile(r"(?i)\b(email|phone|linkedin|github)\b")
+BULLET_CHARS = ("•", "-", "*")
+
+# Canonical section names & aliases (normalize to keys below)
+SECTION_ALIASES = {
+    "PROFESSIONAL SUMMARY": "SUMMARY",
+    "SUMMARY": "SUMMARY",
+    "WORK EXPERIENCE": "EXPERIENCE",
+    "EXPERIENCE": "EXPERIENCE",
+    "EDUCATION": "EDUCATION",
+    "SKILLS": "SKILLS",
+    "TECHNICAL SKILLS": "SKILLS",
+    "CORE SKILLS": "SKILLS",
+    "CORE COMPETENCIES": "SKILLS",
+    "CERTIFICATIONS": "CERTIFICATIONS",
+    "PROJECTS": "PROJECTS",
+    "NOTE": "NOTE",
+    "NOTES": "NOTE",
+}
+# Keys are literal constants (interned by the interpreter), so every parsed
+# resume shares them; keys read back by ParsedResume.from_tuple are interned too.
+CANON_ORDER = ["SUMMARY", "EXPERIENCE", "EDUCATION", "SKILLS", "CERTIFICATIONS", "PROJECTS", "NOTE"]
+
+
+def normalize_header(line):
+    # Detect 'Header: text' or 'Header - text' and split cleanly
+    m = HEADER_RE.match(line)
+    if m:
+        return m.group(1).strip(), m.group(2).strip()
+    return line.strip(), None
+
+
+def is_header(line):
+    hdr, _ = normalize_header(line)
+    return SECTION_ALIASES.get(hdr.upper(), None)
+
+
+def section_title(key):
+    # Display title for a canonical key (not uppercased)
+    return key.title() if key != "NOTE" else "Note"
+
+
+def section_heading(key):
+    # ALL CAPS heading the prompt's format example uses for a canonical key
+    return "PROFESSIONAL SUMMARY" if key == "SUMMARY" else key
+
+
+_EMPTY = ()
+
+
+class Entry:
+    """EXPERIENCE entry: 'Job | Company — Dates' header plus its bullets."""
+    __slots__ = ("header", "bullets")
+
+    def __init__(self, header, bullets=None):
+        self.header = header
+        self.bullets = bullets if bullets is not None else []
+
+    def __getitem__(self, field):
+        # dict-style access kept for callers of the old dict-based structure
+        return getattr(self, field)
+
+    def __eq__(self, other):
+        return isinstance(other, Entry) and (self.header, self.bullets) == (other.header, other.bullets)
+
+    def __repr__(self):
+        return f"Entry({self.header!r}, {self.bullets!r})"
+
+
+class Section:
+    """
+    Content of one canonical section. Fields hold a shared empty tuple
+    until the first item is added, so unused kinds cost nothing.
+    """
+    __slots__ = ("paras", "lines", "bullets", "entries")
+
+    def __init__(self, paras=_EMPTY, lines=_EMPTY, bullets=_EMPTY, entries=_EMPTY):
+        self.paras = paras
+        self.lines = lines
+        self.bullets = bullets
+        self.entries = entries
+
+    def __getitem__(self, field):
+        return getattr(self, field)
+
+    def __bool__(self):
+        return bool(self.paras or self.lines or self.bullets or self.entries)
+
+    def __eq__(self, other):
+        return isinstance(other, Section) and self._fields() == other._fields()
+
+    def __repr__(self):
+        return "Section(%s)" % ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__ if getattr(self, k))
+
+    def _fields(self):
+        return (list(self.paras), list(self.lines), list(self.bullets), list(self.entries))
+
+    def add(self, field, item):
+        items = getattr(self, field)
+        if items is _EMPTY:
+            items = []
+            setattr(self, field, items)
+        items.append(item)
+
+
+class ParsedResume:
+    """
+    Parsed resume: the intermediate representation shared by the PDF
+    renderer and the other exporters. Unpacks like parse_text's result:
+    `name, contacts, sections = parsed`. `sections` only holds sections
+    that have content.
+
+    Serialization: to_json()/from_json() (portable) and to_bytes()/
+    from_bytes() (marshal; faster and smaller, but only for trusted data
+    such as our own cache or worker processes).
+    """
+    __slots__ = ("name", "contacts", "sections")
+    SERIAL_VERSION = 1
+
+    def __init__(self, name, contacts, sections):
+        self.name = name
+        self.contacts = contacts
+        self.sections = sections
+
+    def __iter__(self):
+        return iter((self.name, self.contacts, self.sections))
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __reduce__(self):
+        # compact pickling for process pools
+        return (ParsedResume.from_tuple, (self.to_tuple(),))
+
+    def unique_contacts(self):
+        # Deduplicate and keep order
+        return list(dict.fromkeys(self.contacts))
+
+    def iter_sections(self):
+        """Yield (key, section) for sections with content, in CANON_ORDER."""
+        for key in CANON_ORDER:
+            sec = self.sections.get(key)
+            if sec:
+                yield key, sec
+
+    # ---------- serialization ----------
+    def to_tuple(self):
+        """Nested tuples/lists of plain strings; the shape both serializers use."""
+        return [
+            self.SERIAL_VERSION,
+            self.name,
+            list(self.contacts),
+            [
+                [key, list(sec.paras), list(sec.lines), list(sec.bullets),
+                 [[e.header, list(e.bullets)] for e in sec.entries]]
+                for key, sec in self.iter_sections()
+            ],
+        ]
+
+    @classmethod
+    def from_tuple(cls, data):
+        """Inverse of to_tuple; takes ownership of the (freshly decoded) lists."""
+        version, name, contacts, sections = data
+        if version != cls.SERIAL_VERSION:
+            raise ValueError(f"Unsupported ParsedResume version: {version}")
+        parsed = {}
+        for key, paras, lines, bullets, entries in sections:
+            parsed[sys.intern(key)] = Section(
+                paras or _EMPTY,
+                lines or _EMPTY,
+                bullets or _EMPTY,
+                [Entry(header, b) for header, b in entries] or _EMPTY,
+            )
+        return cls(name, contacts, parsed)
+
+    def to_json(self):
+        return json.dumps(self.to_tuple(), ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls.from_tuple(json.loads(data))
+
+    def to_bytes(self):
+        return marshal.dumps(self.to_tuple())
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls.from_tuple(marshal.loads(data))
+
+
+def _experience_header(line):
+    parts = [p.strip() for p in line.split("|")]
+    # Allow 2 or 3 parts
+    if len(parts) == 3:
+        return f"{parts[0]} | {parts[1]} — {parts[2]}"
+    if len(parts) == 2:
+        return f"{parts[0]} — {parts[1]}"
+    return " | ".join(parts)
+
+
+class ResumeParser:
+    """
+    Incremental, line-driven parser for resume text.
+
+    feed() accepts chunks as they stream in (lines may be split across
+    chunks) and keeps `name`, `contacts` and `sections` up to date; it
+    returns the canonical section keys that were completed by that chunk,
+    i.e. sections the text has moved past. close() flushes the last line.
+    See parse_text for the structure of `sections`.
+    """
+
+    def __init__(self):
+        self.name = None
+        self.contacts = []
+        self.sections = {}
+        self.current = None
+        self.header_complete = False  # True once the first section header was seen
+        self.closed = False
+        self._buffer = ""
+        self._pending_header_text = None  # holds text after "HEADER: text"
+        self._in_entry = False  # previous line was an EXPERIENCE entry header/bullet
+        self._completed = []
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        lines = self._buffer.splitlines(keepends=True)
+        # keep a trailing line without its terminator until more text arrives
+        if lines and lines[-1].splitlines() == [lines[-1]]:
+            self._buffer = lines.pop()
+        else:
+            self._buffer = ""
+        completed_before = len(self._completed)
+        for line in lines:
+            self._feed_line(line.strip())
+        return self._completed[completed_before:]
+
+    def close(self):
+        completed_before = len(self._completed)
+        if self._buffer:
+            self._feed_line(self._buffer.strip())
+            self._buffer = ""
+        if self.current is not None and not self.closed:
+            self._completed.append(self.current)
+        self.closed = True
+        return self._completed[completed_before:]
+
+    def completed_sections(self):
+        return list(self._completed)
+
+    def result(self):
+        return ParsedResume(self.name, self.contacts, self.sections)
+
+    def _section(self, key):
+        sec = self.sections.get(key)
+        if sec is None:
+            sec = self.sections[key] = Section()
+        return sec
+
+    def _feed_line(self, ln):
+        if not ln:
+            return  # drop blanks
+        canon = is_header(ln)
+
+        if not self.header_complete:
+            if not canon:
+                self._header_line(ln)
+                return
+            self.header_complete = True
+
+        if canon:
+            # set current canonical section
+            if self.current is not None:
+                self._completed.append(self.current)
+            hdr, after = normalize_header(ln)
+            self.current = SECTION_ALIASES[hdr.upper()]
+            self._pending_header_text = after  # if "HEADER: text" capture the text as first para
+            self._in_entry = False
+            return
+
+        section = self._section(self.current)
+        is_bullet = ln.startswith(BULLET_CHARS)
+
+        # bullets directly following "Role | Company | Dates" belong to that entry
+        if self._in_entry and is_bullet:
+            section.entries[-1].bullets.append(ln.lstrip("•-* ").strip())
+            return
+        self._in_entry = False
+
+        # add the text that followed a "HEADER: text" line as first paragraph
+        if self._pending_header_text:
+            section.add("paras", self._pending_header_text)
+            self._pending_header_text = None
+
+        # bullets
+        if is_bullet:
+            section.add("bullets", ln.lstrip("•-* ").strip())
+            return
+
+        # Experience: detect "Role | Company | Dates"
+        if self.current == "EXPERIENCE" and "|" in ln:
+            section.add("entries", Entry(_experience_header(ln)))
+            self._in_entry = True
+            return
+
+        # Skills: keep 'Category: items' as lines; otherwise comma list
+        if self.current == "SKILLS":
+            section.add("lines", ln)
+            return
+
+        # default: paragraph or line
+        section.add("paras", ln)
+
+    def _header_line(self, ln):
+        role = _preamble_role(ln, self.name is not None)
+        if role == "name":
+            self.name = ln
+        elif role == "contact":
+            self.contacts.append(ln)
+        else:
+            self._section("SUMMARY").add("paras", ln)
+
+
+def _preamble_role(ln, have_name):
+    """
+    Where a non-blank line before the first section header belongs: "name",
+    "contact", or "SUMMARY" (extra fluff is kept as summary paragraphs).
+    """
+    # first non-empty non-contact line → name (once)
+    if not have_name and not EMAIL_RE.search(ln) and not PHONE_RE.search(ln) and not URL_RE.search(ln):
+        return "name"
+    # contact line: email/phone/url or explicit "Email: ...", "Phone: ..."
+    if EMAIL_RE.search(ln) or PHONE_RE.search(ln) or URL_RE.search(ln) or CONTACT_LABEL_RE.search(ln):
+        return "contact"
+    return "SUMMARY"
+
+
+# ---------- raw-text section blocks ----------
+def section_spans(text):
+    """
+    Split resume text into [(key, start, end)] character spans, using the
+    same rules as ResumeParser. Each span runs from a section header line up
+    to the next header. Before the first header, the name and contact lines
+    have key None and any other line is a "SUMMARY" span without a header,
+    since the parser files it under SUMMARY.
+    """
+    spans = []
+    key, start, pos = None, 0, 0
+    header_seen = have_name = False
+    for line in text.splitlines(keepends=True):
+        ln = line.strip()
+        canon = is_header(ln) if ln else None
+        split = bool(canon)
+        if canon:
+            header_seen = True
+        elif ln and not header_seen:
+            role = _preamble_role(ln, have_name)
+            have_name = have_name or role == "name"
+            canon = "SUMMARY" if role == "SUMMARY" else None
+            split = canon != key
+        if split:
+            if pos > start:
+                spans.append((key, start, pos))
+            key, start = canon, pos
+        pos += len(line)
+    if pos > start:
+        spans.append((key, start, pos))
+    return spans
+
+
+def extract_section(text, key):
+    """Raw text of section `key` (header line included), or None if absent."""
+    blocks = [text[start:end].strip("\n") for k, start, end in section_spans(text) if k == key]
+    return "\n\n".join(blocks) if blocks else None
+
+
+def splice_section(text, key, section_text):
+    """
+    Replace section `key` in `text` with `section_text` (which should start
+    with its header line). Repeated blocks of the same section are merged
+    into the first; a missing section is inserted in CANON_ORDER position.
+    Stray preamble lines counted as SUMMARY are replaced along with it.
+    """
+    spans = section_spans(text)
+    block = section_text.strip("\n") + "\n\n"
+    out, placed = [], False
+    later = set(CANON_ORDER[CANON_ORDER.index(key) + 1:]) if key in CANON_ORDER else set()
+
+    def place():
+        if out and not out[-1].endswith("\n\n"):
+            out[-1] = out[-1].rstrip("\n") + "\n\n"
+        out.append(block)
+
+    for k, start, end in spans:
+        if k == key:
+            # header-less preamble lines the parser filed under this section
+            # are dropped; the block goes where the section's header was
+            if not placed and is_header(text[start:end].strip().split("\n", 1)[0]):
+                place()
+                placed = True
+            continue
+        if not placed and k in later:
+            place()
+            placed = True
+        out.append(text[start:end])
+    if not placed:
+        place()
+    return "".join(out).rstrip("\n") + "\n"
+
+
+def parse_resume(text):
+    """Parse a complete resume text into a ParsedResume."""
+    with metrics.span("parse"):
+        parser = ResumeParser()
+        parser.feed(text)
+        parser.close()
+        return parser.result()
+
+
+def parse_text(text):
+    """
+    Returns:
+      name (str or None),
+      contacts (list[str]),
+      sections (dict[str, Section], only sections with content)
+      Section fields (attributes; sec["paras"] also works):
+        - SUMMARY: .paras
+        - SKILLS: .lines  (preserves 'Category: items' if present)
+        - EXPERIENCE: .entries [Entry(header='Job | Company — Dates', bullets=[...])], .paras
+        - EDUCATION/CERTIFICATIONS/PROJECTS: .lines, .bullets, .paras
+        - NOTE: .paras
+    """
+    return tuple(parse_resume(text))
@@ -0,0 +1,288 @@
+# retrieval.py
+import functools
+import heapq
+import math
+import os
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset(
+    "a an and as at by for from in of on or the to with resume template cv".split()
+)
+# Metadata filters matching at most this many templates are scored exactly over
+# just those vectors; broader filters search the index and drop non-matches.
+PREFILTER_MAX_CANDIDATES = int(os.getenv("PREFILTER_MAX_CANDIDATES", "4096"))
+
+
+def normalize_field(job_field):
+    return " ".join(job_field.split()).lower()
+
+
+def iter_documents(vectorstore):
+    """Yield every Document held by a LangChain FAISS store, in index order."""
+    for doc_id in vectorstore.index_to_docstore_id.values():
+        doc = vectorstore.docstore.search(doc_id)
+        if doc is not None and not isinstance(doc, str):  # docstore returns an error string for misses
+            yield doc
+
+
+def build_field_index(vectorstore):
+    """Map normalized metadata['job_field'] -> templates carrying that field."""
+    index = {}
+    for doc in iter_documents(vectorstore):
+        field = doc.metadata.get("job_field")
+        if field:
+            index.setdefault(normalize_field(field), []).append(doc)
+    return index
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _matches(metadata, filter):
+    for key, wanted in filter.items():
+        value = metadata.get(key)
+        if isinstance(wanted, (set, frozenset, list, tuple)):
+            if value not in wanted:
+                return False
+        elif value != wanted:
+            return False
+    return True
+
+
+class BM25Index:
+    """
+    Okapi BM25 over template text plus metadata values (metadata tokens are
+    counted `metadata_weight` times, so a "DevOps" job_field outweighs a
+    passing mention). Per-term, per-document BM25 weights are computed at
+    build time, so a query is a few dict lookups and additions.
+    """
+
+    def __init__(self, documents, k1=1.2, b=0.75, metadata_weight=3):
+        self.documents = list(documents)
+        self.metadata = [doc.metadata for doc in self.documents]
+        term_freqs, lengths = [], []
+        for doc in self.documents:
+            tokens = tokenize(doc.page_content)
+            for value in doc.metadata.values():
+                if isinstance(value, str):
+                    tokens.extend(tokenize(value) * metadata_weight)
+            freqs = defaultdict(int)
+            for token in tokens:
+                freqs[token] += 1
+            term_freqs.append(freqs)
+            lengths.append(len(tokens))
+        n = len(self.documents)
+        avg_length = (sum(lengths) / n) if n else 0.0
+        doc_freq = defaultdict(int)
+        for freqs in term_freqs:
+            for term in freqs:
+                doc_freq[term] += 1
+        self.postings = {}
+        for i, freqs in enumerate(term_freqs):
+            norm = k1 * (1 - b + b * lengths[i] / avg_length) if avg_length else k1
+            for term, tf in freqs.items():
+                idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                self.postings.setdefault(term, []).append((i, idf * tf * (k1 + 1) / (tf + norm)))
+
+    def __len__(self):
+        return len(self.documents)
+
+    def scores(self, query, allowed=None):
+        """{doc position: BM25 score} for documents matching any query term."""
+        acc = defaultdict(float)
+        for term in set(tokenize(query)):
+            for i, weight in self.postings.get(term, ()):
+                if allowed is None or i in allowed:
+                    acc[i] += weight
+        return acc
+
+    def allowed(self, filter):
+        """Positions of documents whose metadata matches `filter` (None = all)."""
+        if not filter:
+            return None
+        return {i for i, metadata in enumerate(self.metadata) if _matches(metadata, filter)}
+
+    def search(self, query, k=4, filter=None):
+        acc = self.scores(query, self.allowed(filter))
+        return [(self.documents[i], score) for i, score in heapq.nlargest(k, acc.items(), key=lambda x: x[1])]
+
+
+class HybridRetriever:
+    """
+    Lexical + vector template search over the FAISS store's documents.
+
+    search() fuses min-max normalized BM25 and vector similarity scores
+    as alpha * vector + (1 - alpha) * lexical over the union of both
+    candidate lists, after metadata pre-filtering. mode="lexical" never
+    touches the embedding model; mode="auto" answers lexically when the
+    top BM25 hit clearly wins (its score is at least `confident_ratio`
+    times that of the best hit from a different `group_key` value, i.e.
+    another job field) and only embeds the query otherwise.
+    """
+
+    def __init__(self, vectorstore, embeddings, alpha=0.3, candidates=20, confident_ratio=1.5,
+                 group_key="job_field", embed_query=None):
+        self.vectorstore = vectorstore
+        documents, self._faiss_to_doc = [], {}
+        for faiss_pos, doc_id in vectorstore.index_to_docstore_id.items():
+            doc = vectorstore.docstore.search(doc_id)
+            if doc is not None and not isinstance(doc, str):
+                self._faiss_to_doc[faiss_pos] = len(documents)
+                documents.append(doc)
+        self._doc_to_faiss = {i: faiss_pos for faiss_pos, i in self._faiss_to_doc.items()}
+        self.bm25 = BM25Index(documents)
+        # L2 indexes return distances (smaller is closer), inner-product ones similarities
+        self._sign = 1.0 if "INNER_PRODUCT" in str(getattr(vectorstore, "distance_strategy", "")).upper() else -1.0
+        self.alpha = alpha
+        self.candidates = candidates
+        self.confident_ratio = confident_ratio
+        self.group_key = group_key
+        self._embed_query = embed_query or embeddings.embed_query
+
+    def _vector_scores(self, query, k, allowed):
+        """
+        {doc position: similarity} for the k nearest templates within `allowed`.
+
+        A selective filter (at most PREFILTER_MAX_CANDIDATES documents) is
+        applied before the vector search: only the allowed vectors are
+        reconstructed and scored, exactly as the index would. A broad filter
+        is applied after it instead, doubling the fetch size until k allowed
+        hits survive or the whole index has been fetched.
+        """
+        index = self.vectorstore.index
+        if not index.ntotal or (allowed is not None and not allowed):
+            return {}
+        vector = np.asarray([self._embed_query(query)], dtype=np.float32)
+        if allowed is not None and len(allowed) <= PREFILTER_MAX_CANDIDATES:
+            scores = self._prefiltered_scores(vector, allowed)
+            if scores is not None:
+                return dict(heapq.nlargest(k, scores.items(), key=lambda x: x[1]))
+
+        want = k if allowed is None else min(k, len(allowed))
+        fetch = k if allowed is None else k * max(4, len(self.bm25) // len(allowed))
+        while True:
+            fetch = min(index.ntotal, fetch)
+            distances, positions = index.search(vector, fetch)
+            scores = {}
+            for distance, faiss_pos in zip(distances[0], positions[0]):
+                i = self._faiss_to_doc.get(int(faiss_pos))
+                if i is not None and (allowed is None or i in allowed):
+                    scores[i] = self._sign * float(distance)
+            if len(scores) >= want or fetch >= index.ntotal:
+                return dict(heapq.nlargest(k, scores.items(), key=lambda x: x[1]))
+            fetch *= 2
+
+    def _prefiltered_scores(self, vector, allowed):
+        """Exact scores over the allowed documents' stored vectors, or None if the index can't return them."""
+        import faiss
+        docs = sorted(allowed)
+        ids = np.asarray([self._doc_to_faiss[i] for i in docs], dtype=np.int64)
+        index = self.vectorstore.index
+        try:
+            try:
+                stored = index.reconstruct_batch(ids)
+            except RuntimeError:
+                # IVF indexes need an id -> list map before they can reconstruct
+                ivf = faiss.try_extract_index_ivf(index)
+                if ivf is None:
+                    raise
+                ivf.make_direct_map()
+                stored = index.reconstruct_batch(ids)
+        except RuntimeError:
+            return None
+        if self._sign > 0:
+            sims = stored @ vector[0]
+        else:
+            # squared L2, as faiss reports it
+            sims = -((stored - vector[0]) ** 2).sum(axis=1)
+        return dict(zip(docs, sims.tolist()))
+
+    def _confident(self, lexical):
+        ranked = sorted(lexical.items(), key=lambda x: x[1], reverse=True)
+        best, best_score = ranked[0]
+        group = self.bm25.metadata[best].get(self.group_key)
+        for i, score in ranked[1:]:
+            if self.bm25.metadata[i].get(self.group_key) != group or group is None:
+                return best_score >= self.confident_ratio * score
+        return True
+
+    @staticmethod
+    def _normalize(scores):
+        if not scores:
+            return {}
+        low, high = min(scores.values()), max(scores.values())
+        span = high - low
+        return {i: (s - low) / span if span else 1.0 for i, s in scores.items()}
+
+    def search(self, query, k=4, filter=None, mode="hybrid"):
+        """[(Document, score)] best first; mode is "hybrid", "lexical", "vector" or "auto"."""
+        allowed = self.bm25.allowed(filter)
+        lexical = self.bm25.scores(query, allowed) if mode != "vector" else {}
+        if mode == "lexical":
+            top = heapq.nlargest(k, lexical.items(), key=lambda x: x[1])
+            return [(self.bm25.documents[i], score) for i, score in top]
+        if mode == "auto" and lexical and self._confident(lexical):
+            top = heapq.nlargest(k, lexical.items(), key=lambda x: x[1])
+            return [(self.bm25.documents[i], score) for i, score in top]
+
+        vector = self._vector_scores(query, max(k, self.candidates), allowed)
+        if mode == "vector":
+            fused = self._normalize(vector)
+        else:
+            lexical = dict(heapq.nlargest(max(k, self.candidates), lexical.items(), key=lambda x: x[1]))
+            lex_norm, vec_norm = self._normalize(lexical), self._normalize(vector)
+            fused = {
+                i: self.alpha * vec_norm.get(i, 0.0) + (1 - self.alpha) * lex_norm.get(i, 0.0)
+                for i in set(lex_norm) | set(vec_norm)
+            }
+        top = heapq.nlargest(k, fused.items(), key=lambda x: x[1])
+        return [(self.bm25.documents[i], score) for i, score in top]
+
+
+class TemplateRetriever:
+    """
+    Resolve a job field to its resume template.
+
+    Known fields (those present in template metadata) are answered from a
+    precomputed field -> document index with no embedding call. Free-text or
+    unknown fields go through HybridRetriever in "auto" mode: a clear BM25
+    winner is returned without embedding, anything else is fused with FAISS
+    similarity. Query embeddings are memoized so repeated lookups skip the
+    model forward pass.
+    """
+
+    def __init__(self, vectorstore, embeddings, embedding_cache_size=256):
+        self.vectorstore = vectorstore
+        self.field_index = build_field_index(vectorstore)
+        self._embed_query = functools.lru_cache(maxsize=embedding_cache_size)(embeddings.embed_query)
+        self.hybrid = HybridRetriever(vectorstore, embeddings, embed_query=self._embed_query)
+        self._lock = threading.Lock()
+        self.index_hits = 0
+        self.vector_searches = 0
+
+    def get_template(self, job_field):
+        docs = self.field_index.get(normalize_field(job_field))
+        if docs:
+            with self._lock:
+                self.index_hits += 1
+            return docs[0]
+
+        with self._lock:
+            self.vector_searches += 1
+        results = self.hybrid.search(f"Resume template for {job_field}", k=1, mode="auto")
+        return results[0][0] if results else None
+
+    def stats(self):
+        info = self._embed_query.cache_info()
+        return {
+            "index_hits": self.index_hits,
+            "vector_searches": self.vector_searches,
+            "embedding_cache_hits": info.hits,
+            "embedding_cache_misses": info.misses,
+        }
@@ -0,0 +1,120 @@
+# session_store.py
+"""
+Per-session store of finished results in st.session_state, so Streamlit
+reruns (download clicks, widget changes) redraw from memory instead of
+calling the LLM or ReportLab again.
+
+Entries are keyed by an input fingerprint (the generation cache's
+request_fingerprint plus prompt version, generation mode and model) and
+hold the text, the ParsedResume and the exported bytes per format. Each
+session keeps at most SESSION_MAX_RESULTS entries and SESSION_MAX_BYTES
+of text + exports; entries older than SESSION_RESULT_TTL are dropped.
+The entry being shown is never evicted.
+"""
+import os
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from config import GENERATION_MODE, MODEL_NAME
+from generation_cache import request_fingerprint
+from prompt_templates import PROMPT_VERSION
+
+SESSION_MAX_RESULTS = int(os.getenv("SESSION_MAX_RESULTS", "5"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(20 * 1024 * 1024)))
+SESSION_RESULT_TTL = int(os.getenv("SESSION_RESULT_TTL", "3600"))
+
+_STATE_KEY = "resume_results"
+_CURRENT_KEY = "resume_results_current"
+
+
+def input_fingerprint(user_details, job_field):
+    return request_fingerprint(user_details, job_field, f"{PROMPT_VERSION}-{GENERATION_MODE}", MODEL_NAME)
+
+
+class SessionResult:
+    """One finished generation: text, parsed model, exports and how it was produced."""
+    __slots__ = ("key", "name", "job_field", "user_details", "content", "parsed", "exports", "stats", "created")
+
+    def __init__(self, key, name, job_field, user_details, content, parsed, stats=None):
+        self.key = key
+        self.name = name
+        self.job_field = job_field
+        self.user_details = user_details
+        self.content = content
+        self.parsed = parsed
+        self.exports = {}
+        self.stats = stats or {}
+        self.created = time.time()
+
+    @property
+    def nbytes(self):
+        # parsed model holds roughly another copy of the text
+        return 3 * len(self.content.encode("utf-8")) + sum(len(data) for data in self.exports.values())
+
+    def replace_content(self, content, parsed):
+        """New text for the same inputs (e.g. a rewritten section); stale exports are dropped."""
+        self.content = content
+        self.parsed = parsed
+        self.exports = {}
+
+
+class SessionResultStore:
+    """LRU of SessionResult objects living in st.session_state."""
+
+    def __init__(self, state=None, max_results=SESSION_MAX_RESULTS, max_bytes=SESSION_MAX_BYTES,
+                 ttl_seconds=SESSION_RESULT_TTL):
+        self.state = st.session_state if state is None else state
+        self.max_results = max_results
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        if _STATE_KEY not in self.state:
+            self.state[_STATE_KEY] = OrderedDict()
+
+    @property
+    def _entries(self):
+        return self.state[_STATE_KEY]
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, entry):
+        self._entries[entry.key] = entry
+        self._entries.move_to_end(entry.key)
+        self.current = entry
+        self.evict()
+        return entry
+
+    @property
+    def current(self):
+        key = self.state.get(_CURRENT_KEY)
+        return self.get(key) if key is not None else None
+
+    @current.setter
+    def current(self, entry):
+        self.state[_CURRENT_KEY] = entry.key if entry is not None else None
+
+    def evict(self):
+        """Drop stale entries, then least recently used ones over the count/byte budget."""
+        now = time.time()
+        keep = self.state.get(_CURRENT_KEY)
+        for key in [k for k, e in self._entries.items() if now - e.created > self.ttl_seconds and k != keep]:
+            del self._entries[key]
+        total = sum(e.nbytes for e in self._entries.values())
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_results and total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key).nbytes
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": sum(e.nbytes for e in self._entries.values())}
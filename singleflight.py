@@ -0,0 +1,106 @@
+# singleflight.py
+import asyncio
+import threading
+
+
+class LeaderAbandoned(RuntimeError):
+    """The leader stopped without a result (e.g. its generator was closed); retry."""
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        if not self.event.wait(timeout):
+            raise TimeoutError("Timed out waiting for in-flight call")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Process-wide coalescing of identical in-flight calls. The first caller
+    for a key (the leader) does the work; concurrent callers with the same
+    key wait for and share its result or exception. Works across threads
+    (Streamlit sessions) and from asyncio code via ado().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def join(self, key):
+        """
+        Returns (call, is_leader). A leader must report back with finish(),
+        even on failure; everyone else calls call.wait().
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.leaders += 1
+            return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        """
+        Publish the leader's outcome. Errors that are not Exceptions
+        (GeneratorExit when Streamlit closes the leader's generator,
+        KeyboardInterrupt) are not handed to followers: they get
+        LeaderAbandoned and retry, one of them becoming the new leader.
+        """
+        if error is not None and not isinstance(error, Exception):
+            error = LeaderAbandoned("Leader abandoned the in-flight call")
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.result = result
+        call.error = error
+        call.event.set()
+
+    def do(self, key, fn):
+        while True:
+            call, leader = self.join(key)
+            if leader:
+                break
+            try:
+                return call.wait()
+            except LeaderAbandoned:
+                continue
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+    async def ado(self, key, coro_fn):
+        while True:
+            call, leader = self.join(key)
+            if leader:
+                break
+            try:
+                return await asyncio.get_running_loop().run_in_executor(None, call.wait)
+            except LeaderAbandoned:
+                continue
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
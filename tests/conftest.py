@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Keep caches and indexes out of the working tree; set before config is imported
+_tmp = tempfile.mkdtemp(prefix="resume-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["FAISS_INDEX_DIR"] = os.path.join(_tmp, "faiss_index")
+os.environ["GENERATION_CACHE_PATH"] = os.path.join(_tmp, "generation_cache.sqlite3")
+os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(_tmp, "embedding_cache.sqlite3")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
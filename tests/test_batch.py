@@ -0,0 +1,60 @@
+import asyncio
+import json
+from concurrent.futures import Future
+
+import batch
+
+GOOD = {"name": "Jane Doe", "email": "j@x.com", "phone": 5551234, "education": "BSc",
+        "experience": "5 years", "skills": "Python", "job_field": "Data Science"}
+
+
+class FakeRenderPool:
+    def __init__(self, workers=None):
+        pass
+
+    def submit(self, resume):
+        future = Future()
+        future.set_result(b"%PDF-fake")
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def run(tmp_path, monkeypatch, lines):
+    import resume_generator
+
+    async def fake_generate(user_details, job_field, raise_errors=False, mode=None):
+        return f"Resume for {job_field}\n{user_details}"
+
+    monkeypatch.setattr(resume_generator, "agenerate_resume_content", fake_generate)
+    monkeypatch.setattr(batch, "RenderPool", FakeRenderPool)
+    path = tmp_path / "in.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    out = tmp_path / "out"
+    counts = asyncio.run(batch.run_batch(str(path), str(out), concurrency=2))
+    records = [json.loads(line) for line in (out / batch.RESULTS_FILE).read_text().splitlines()]
+    return counts, {r["id"]: r for r in records}
+
+
+def test_malformed_line_is_recorded_not_fatal(tmp_path, monkeypatch):
+    counts, records = run(tmp_path, monkeypatch, [json.dumps(GOOD), '{"name": "broken', json.dumps(GOOD)])
+    assert counts == {"ok": 2, "error": 1, "skipped": 0}
+    assert records["1"]["status"] == "ok" and records["3"]["status"] == "ok"
+    assert records["2"]["status"] == "error" and "line 2" in records["2"]["error"]
+
+
+def test_non_object_line_is_recorded(tmp_path, monkeypatch):
+    counts, records = run(tmp_path, monkeypatch, [json.dumps(GOOD), "[1, 2]"])
+    assert counts["ok"] == 1 and counts["error"] == 1
+    assert "JSON object" in records["2"]["error"]
+
+
+def test_rerun_skips_finished_rows_and_retries_bad_line(tmp_path, monkeypatch):
+    lines = [json.dumps(GOOD), "not json", json.dumps(GOOD)]
+    run(tmp_path, monkeypatch, lines)
+    counts, _ = run(tmp_path, monkeypatch, lines)
+    assert counts == {"ok": 0, "error": 1, "skipped": 2}
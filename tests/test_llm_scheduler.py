@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeMessage, FakeRateLimitError
+from llm_scheduler import AdaptiveConcurrency, ScheduledChatModel
+
+
+class ScriptedModel:
+    """
+    Chat model whose calls follow a script: each call takes the next
+    (delay, outcome) step, where outcome is the reply text or an exception.
+    Records cancelled async calls and closed streams.
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self.cancelled = []
+        self.closed = []
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            self.calls += 1
+            return self.calls, self.steps.pop(0)
+
+    def invoke(self, prompt, **kwargs):
+        _, (delay, outcome) = self._next()
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeMessage(outcome)
+
+    async def ainvoke(self, prompt, **kwargs):
+        number, (delay, outcome) = self._next()
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(number)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeMessage(outcome)
+
+    def stream(self, prompt, **kwargs):
+        number, (delay, outcome) = self._next()
+        try:
+            time.sleep(delay)
+            if isinstance(outcome, Exception):
+                raise outcome
+            for word in outcome.split(" "):
+                yield FakeMessage(word)
+        finally:
+            self.closed.append(number)
+
+
+def scheduled(model, **options):
+    sleeps = []
+    options = dict(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9, sleep=sleeps.append, **options)
+    return ScheduledChatModel(model, **options), sleeps
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+def test_rate_limit_is_retried_after_backoff():
+    model = ScriptedModel([(0, FakeRateLimitError("429")), (0, "ok")])
+    llm, sleeps = scheduled(model, backoff_base=1.0, backoff_max=1.0)
+    assert llm.invoke("prompt").content == "ok"
+    assert model.calls == 2
+    assert llm.counters["rate_limited"] == 1 and llm.counters["retries"] == 1
+    backoffs = [s for s in sleeps if s > 0]
+    assert len(backoffs) == 1 and backoffs[0] <= 1.0
+
+
+def test_non_retryable_error_is_not_retried():
+    model = ScriptedModel([(0, ValueError("bad request"))])
+    llm, _ = scheduled(model)
+    with pytest.raises(ValueError):
+        llm.invoke("prompt")
+    assert model.calls == 1 and llm.counters["failures"] == 1
+
+
+def test_aimd_halves_on_rate_limit_and_grows_additively():
+    limit = AdaptiveConcurrency(initial=8, minimum=1, maximum=32)
+    limit.acquire()
+    limit.release(rate_limited=True)
+    assert limit.limit == 4
+    for _ in range(4):  # one full window of successes at limit 4 adds one slot
+        limit.acquire()
+        limit.release()
+    assert limit.limit == pytest.approx(5, abs=0.1)
+    assert limit.in_flight == 0
+
+
+def test_scheduler_shrinks_concurrency_on_429():
+    model = ScriptedModel([(0, FakeRateLimitError("429")), (0, "ok")])
+    llm, _ = scheduled(model, initial_concurrency=8)
+    llm.invoke("prompt")
+    assert 4 <= llm.concurrency.limit < 5
+
+
+def test_hedged_invoke_returns_faster_result():
+    model = ScriptedModel([(0.5, "slow primary"), (0, "fast hedge")])
+    llm, _ = scheduled(model, hedge_after=0.05)
+    start = time.perf_counter()
+    assert llm.invoke("prompt").content == "fast hedge"
+    assert time.perf_counter() - start < 0.4
+    assert llm.counters["hedges"] == 1 and llm.counters["hedge_wins"] == 1
+
+
+def test_hedged_ainvoke_cancels_the_loser():
+    model = ScriptedModel([(0.5, "slow primary"), (0, "fast hedge")])
+    llm, _ = scheduled(model, hedge_after=0.05)
+    assert asyncio.run(llm.ainvoke("prompt")).content == "fast hedge"
+    assert model.cancelled == [1]
+    assert llm.counters["hedge_wins"] == 1
+
+
+def test_hedged_stream_commits_to_first_chunk_and_closes_other():
+    model = ScriptedModel([(0.3, "slow primary"), (0, "fast hedge")])
+    llm, _ = scheduled(model, hedge_after=0.05)
+    text = " ".join(chunk.content for chunk in llm.stream("prompt"))
+    assert text == "fast hedge"
+    assert llm.counters["hedges"] == 1 and llm.counters["hedge_wins"] == 1
+    # the primary is closed once its late first chunk arrives
+    wait_for(lambda: sorted(model.closed) == [1, 2])
+    assert llm.concurrency.in_flight == 0
+
+
+def test_hedged_stream_keeps_primary_when_it_answers_first():
+    model = ScriptedModel([(0.1, "primary wins"), (0.5, "late hedge")])
+    llm, _ = scheduled(model, hedge_after=0.05)
+    assert " ".join(chunk.content for chunk in llm.stream("prompt")) == "primary wins"
+    assert llm.counters["hedges"] == 1 and llm.counters["hedge_wins"] == 0
+    wait_for(lambda: sorted(model.closed) == [1, 2])
+
+
+def test_stream_retries_before_first_chunk():
+    model = ScriptedModel([(0, FakeRateLimitError("429")), (0, "second try")])
+    llm, _ = scheduled(model)
+    assert " ".join(chunk.content for chunk in llm.stream("prompt")) == "second try"
+    assert llm.counters["retries"] == 1
@@ -0,0 +1,54 @@
+import numpy as np
+
+from benchmarks.fakes import FakeEmbeddings
+from matching import JobDescription, ResumeMatcher
+
+RESUME = """Jane Doe
+EMAIL
+jane@email.com
+PROFESSIONAL SUMMARY
+Data analyst working with Python and SQL.
+SKILLS
+Languages: Python, SQL
+"""
+
+
+def matcher():
+    return ResumeMatcher(FakeEmbeddings(dim=16), cache=None)
+
+
+def test_no_jds():
+    assert matcher().score_matrix([RESUME], []).shape == (1, 0)
+    assert matcher().match([RESUME], []) == [[]]
+
+
+def test_title_only_jds():
+    jds = [JobDescription.from_text("a", "Title only"), JobDescription.from_text("b", "Another title")]
+    scores = matcher().score_matrix([RESUME, RESUME], jds)
+    assert scores.shape == (2, 2)
+    assert not scores.any()
+    assert [len(m) for m in matcher().match([RESUME], jds)] == [2]
+
+
+def test_title_only_jd_next_to_real_one():
+    jds = [JobDescription.from_text("a", "Title only"),
+           JobDescription.from_text("b", "Analyst\nRequirements:\n• Python\nSkills: SQL")]
+    scores = matcher().score_matrix([RESUME], jds)
+    assert scores[0, 0] == 0 and scores[0, 1] > 0
+
+
+def test_no_resumes():
+    jds = [JobDescription.from_text("b", "Analyst\nRequirements:\n• Python")]
+    assert matcher().score_matrix([], jds).shape == (0, 1)
+    assert matcher().match([], jds) == []
+
+
+def test_matches_brute_force():
+    jds = [JobDescription.from_text("b", "Analyst\nRequirements:\n• Python\n• Budget forecasting\nSkills: SQL")]
+    m = matcher()
+    from matching import resume_units
+    from resume_parser import parse_resume
+    units = m.embed(resume_units(parse_resume(RESUME)))
+    reqs = m.embed(jds[0].requirements)
+    expected = (units @ reqs.T).max(axis=0).mean()
+    assert np.isclose(m.score_matrix([RESUME], jds)[0, 0], expected, atol=1e-6)
@@ -0,0 +1,58 @@
+import resume_generator
+from benchmarks.fakes import FakeMessage
+from resume_parser import extract_section, parse_resume, section_spans, splice_section
+
+# model output with filler between the contact block and the first section header
+RESUME = """Jane Doe
+Here is your tailored resume!
+jane@email.com
+
+PROFESSIONAL SUMMARY
+Old summary.
+
+EXPERIENCE
+Developer | Acme | 2020 - Present
+• Shipped things
+"""
+
+
+def test_spans_follow_parser_for_preamble_filler():
+    keys = [key for key, _, _ in section_spans(RESUME)]
+    assert keys == [None, "SUMMARY", None, "SUMMARY", "EXPERIENCE"]
+    assert parse_resume(RESUME).sections["SUMMARY"]["paras"] == ["Here is your tailored resume!", "Old summary."]
+    assert extract_section(RESUME, "SUMMARY") == "Here is your tailored resume!\n\nPROFESSIONAL SUMMARY\nOld summary."
+
+
+def test_splice_replaces_filler_with_the_section():
+    spliced = splice_section(RESUME, "SUMMARY", "PROFESSIONAL SUMMARY\nNew summary.")
+    assert "Here is your tailored resume!" not in spliced
+    assert spliced.count("PROFESSIONAL SUMMARY") == 1
+    parsed = parse_resume(spliced)
+    assert parsed.contacts == ["jane@email.com"]
+    assert parsed.sections["SUMMARY"]["paras"] == ["New summary."]
+    assert parsed.sections["EXPERIENCE"] == parse_resume(RESUME).sections["EXPERIENCE"]
+
+
+def test_splice_other_section_keeps_filler():
+    spliced = splice_section(RESUME, "EDUCATION", "EDUCATION\nBSc Computer Science")
+    assert parse_resume(spliced).sections["SUMMARY"] == parse_resume(RESUME).sections["SUMMARY"]
+
+
+def test_regenerate_section_with_filler_before_first_header(monkeypatch):
+    class Model:
+        def invoke(self, prompt):
+            self.prompt = prompt
+            # the reply also opens with chatter before its heading
+            return FakeMessage("Sure, here it is:\nPROFESSIONAL SUMMARY\nNew summary.\n")
+
+    model = Model()
+    monkeypatch.setattr(resume_generator, "get_llm", lambda: model)
+    monkeypatch.setattr(resume_generator, "_template_section", lambda job_field, key: None)
+
+    content, parsed, changed = resume_generator.regenerate_section(RESUME, "SUMMARY", "Software")
+    assert changed
+    assert "Here is your tailored resume!" in model.prompt  # sent as part of the current section
+    assert "Sure, here it is" not in content
+    assert content.count("PROFESSIONAL SUMMARY") == 1
+    assert parse_resume(content) == parsed
+    assert parsed.sections["SUMMARY"]["paras"] == ["New summary."]
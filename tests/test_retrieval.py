@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import retrieval
+from benchmarks.fakes import FakeEmbeddings
+from retrieval import HybridRetriever
+from vectorstore import build_vectorstore
+
+DIM = 16
+N = 2000
+RARE = 5  # templates in the rare field, far below the default oversampling
+
+
+def corpus():
+    rnd = np.random.default_rng(0)
+    vectors = rnd.standard_normal((N, DIM)).astype("float32")
+    fields = ["Rare" if i % (N // RARE) == 0 else "Common" for i in range(N)]
+    texts = [f"template {i}" for i in range(N)]
+    metadatas = [{"job_field": field} for field in fields]
+    return vectors, metadatas, texts
+
+
+def retriever(vectors, metadatas, texts, query):
+    store = build_vectorstore(list(zip(texts, vectors.tolist())), FakeEmbeddings(dim=DIM), metadatas)
+    return HybridRetriever(store, None, embed_query=lambda q: query)
+
+
+def expected(vectors, metadatas, query, field, k):
+    rows = [i for i, m in enumerate(metadatas) if m["job_field"] == field]
+    distances = ((vectors[rows] - query) ** 2).sum(axis=1)
+    return [rows[j] for j in np.argsort(distances)[:k]]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf", "hnsw"])
+def test_rare_filter_returns_nearest_allowed_templates(monkeypatch, index_type):
+    monkeypatch.setattr("vectorstore.FAISS_INDEX_TYPE", index_type)
+    vectors, metadatas, texts = corpus()
+    query = vectors[1] + 0.01
+    hybrid = retriever(vectors, metadatas, texts, query.tolist())
+    allowed = hybrid.bm25.allowed({"job_field": "Rare"})
+    assert len(allowed) == RARE
+
+    scores = hybrid._vector_scores("query", 4, allowed)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    assert ranked == expected(vectors, metadatas, query, "Rare", 4)
+
+
+def test_broad_filter_post_filters_until_k_hits(monkeypatch):
+    monkeypatch.setattr(retrieval, "PREFILTER_MAX_CANDIDATES", 0)
+    monkeypatch.setattr("vectorstore.FAISS_INDEX_TYPE", "flat")
+    vectors, metadatas, texts = corpus()
+    # far from every Rare template, so a fixed oversampled fetch would find none
+    query = vectors[2] + 0.01
+    hybrid = retriever(vectors, metadatas, texts, query.tolist())
+    allowed = hybrid.bm25.allowed({"job_field": "Rare"})
+
+    scores = hybrid._vector_scores("query", 4, allowed)
+    assert len(scores) == 4
+    assert set(scores) <= allowed
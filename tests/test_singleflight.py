@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import LeaderAbandoned, SingleFlight
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.001)
+
+
+def test_follower_shares_leader_result():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(2)
+        return object()
+
+    results = {}
+    leader = threading.Thread(target=lambda: results.setdefault("leader", flights.do("k", work)))
+    leader.start()
+    wait_for(lambda: calls)
+    follower = threading.Thread(target=lambda: results.setdefault("follower", flights.do("k", work)))
+    follower.start()
+    # the follower has joined the leader's flight (not started its own) before the leader finishes
+    wait_for(lambda: flights.stats()["coalesced"] == 1)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+    assert len(calls) == 1
+    assert results["follower"] is results["leader"]
+
+
+def test_follower_retries_when_leader_abandons():
+    flights = SingleFlight()
+    call, leader = flights.join("k")
+    assert leader
+    results = []
+    follower = threading.Thread(target=lambda: results.append(flights.do("k", lambda: "follower")))
+    follower.start()
+    wait_for(lambda: flights.stats()["coalesced"] == 1)
+    flights.finish("k", call, error=GeneratorExit())
+    follower.join(2)
+    assert results == ["follower"]
+    assert flights.stats()["leaders"] == 2
+
+
+def test_followers_share_leader_exception():
+    flights = SingleFlight()
+    call, _ = flights.join("k")
+    flights.finish("k", call, error=ValueError("boom"))
+    with pytest.raises(ValueError):
+        call.wait(1)
+
+
+def test_abandoned_wait_raises_leader_abandoned():
+    flights = SingleFlight()
+    call, _ = flights.join("k")
+    flights.finish("k", call, error=KeyboardInterrupt())
+    with pytest.raises(LeaderAbandoned):
+        call.wait(1)
+
+
+def test_stream_follower_regenerates_after_leader_closed(monkeypatch):
+    import resume_generator as rg
+
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fake_stream(user_details, job_field, tokens):
+        calls.append(1)
+        yield "Jane Doe\n"
+        release.wait(2)
+        yield "PROFESSIONAL SUMMARY\nGood.\n"
+
+    monkeypatch.setattr(rg, "generation_flights", flights)
+    monkeypatch.setattr(rg, "_stream_single", fake_stream)
+    monkeypatch.setattr(rg, "_cached", lambda key: None)
+    monkeypatch.setattr(rg, "_store", lambda key, content: None)
+
+    leader = rg.stream_resume_content("details", "Field", mode="single")
+    assert next(leader) == "Jane Doe\n"
+
+    stats = {}
+    chunks = []
+    follower = threading.Thread(
+        target=lambda: chunks.extend(rg.stream_resume_content("details", "Field", stats, mode="single")))
+    follower.start()
+    wait_for(lambda: flights.stats()["coalesced"] == 1)
+    leader.close()  # Streamlit rerun: the leader's generator is closed mid-stream
+    release.set()
+    follower.join(5)
+
+    assert stats["ok"]
+    assert not stats["coalesced"]
+    assert len(calls) == 2  # the follower took over as leader
+    assert "".join(chunks) == "Jane Doe\nPROFESSIONAL SUMMARY\nGood.\n"
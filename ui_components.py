@@ -1,5 +1,13 @@
 import streamlit as st
 
+EXPORT_FORMAT_LABELS = {
+    "pdf": "PDF",
+    "docx": "Word (DOCX)",
+    "html": "HTML",
+    "md": "Markdown",
+    "txt": "Plain Text (ATS)",
+}
+
 def resume_form():
     with st.form("resume_form", clear_on_submit=False):
         name = st.text_input("Full Name *", placeholder="John Doe")
@@ -28,5 +36,11 @@ def resume_form():
             "Target Job Field *", 
             ["Software Engineering", "Data Science", "Marketing", "Finance", "Other"]
         )
+        export_formats = st.multiselect(
+            "Download Formats",
+            list(EXPORT_FORMAT_LABELS),
+            default=["pdf"],
+            format_func=EXPORT_FORMAT_LABELS.get
+        )
         submitted = st.form_submit_button("🚀 Generate Resume", use_container_width=True)
-    return name, email, phone, education, experience, skills, job_field, submitted
+    return name, email, phone, education, experience, skills, job_field, export_formats, submitted
@@ -1,17 +1,118 @@
+import math
+import os
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
-from langchain.schema import Document
+from langchain_core.documents import Document
 import streamlit as st
+from index_store import LEGACY_PICKLE_FILE, has_index, load_index, save_index
+
+INDEX_DIR = os.getenv("FAISS_INDEX_DIR", "./faiss_index")
+
+# Index type used when a new index is built: "flat" (exact), "ivf" or "hnsw".
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat").lower()
+# PQ sub-quantizers for compressed codes (0 = store full vectors); must divide the dimension.
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "0"))
+# IVF lists (0 = 4 * sqrt(n)) and lists probed per query.
+FAISS_IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", "0"))
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "8"))
+# HNSW graph degree and search breadth.
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+# PQ/IVF training needs enough vectors; smaller corpora fall back to a flat index.
+PQ_MIN_TRAINING = 256 * 10
+IVF_MIN_POINTS_PER_LIST = 39
+
+
+def index_factory_string(dim, n, index_type=None, pq_m=None, nlist=None, hnsw_m=None):
+    """faiss.index_factory description for the configured index type and corpus size."""
+    index_type = (index_type or FAISS_INDEX_TYPE).lower()
+    pq_m = FAISS_PQ_M if pq_m is None else pq_m
+    nlist = FAISS_IVF_NLIST if nlist is None else nlist
+    hnsw_m = FAISS_HNSW_M if hnsw_m is None else hnsw_m
+
+    if pq_m and (dim % pq_m or n < PQ_MIN_TRAINING):
+        pq_m = 0
+    if index_type == "ivf":
+        nlist = nlist or max(1, int(4 * math.sqrt(n)))
+        if n < nlist * IVF_MIN_POINTS_PER_LIST:
+            nlist = n // IVF_MIN_POINTS_PER_LIST
+        if nlist < 2:
+            index_type = "flat"
+        else:
+            return f"IVF{nlist},PQ{pq_m}" if pq_m else f"IVF{nlist},Flat"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m}_PQ{pq_m}" if pq_m else f"HNSW{hnsw_m}"
+    if index_type != "flat":
+        raise ValueError(f"Unknown FAISS_INDEX_TYPE: {index_type!r}")
+    return f"PQ{pq_m}" if pq_m else "Flat"
+
+
+def configure_search(index, nprobe=None, ef_search=None):
+    """Apply query-time parameters (nprobe / efSearch) where the index supports them."""
+    import faiss
+    params = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe or FAISS_NPROBE), ("efSearch", ef_search or FAISS_EF_SEARCH)):
+        try:
+            params.set_index_parameter(index, name, value)
+        except RuntimeError:
+            pass  # not applicable to this index type
+    return index
+
+
+def build_faiss_index(vectors, **options):
+    """Create, train and fill a faiss index over `vectors` (n x d float32)."""
+    import faiss
+    import numpy as np
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, dim = vectors.shape
+    index = faiss.index_factory(dim, index_factory_string(dim, n, **options))
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return configure_search(index)
+
+
+def build_vectorstore(text_embeddings, embeddings, metadatas=None, ids=None):
+    """
+    LangChain FAISS store over precomputed (text, vector) pairs, using the
+    configured index type instead of FAISS.from_embeddings' flat index.
+    """
+    import uuid
+    texts = [text for text, _ in text_embeddings]
+    index = build_faiss_index([vector for _, vector in text_embeddings])
+    metadatas = metadatas or [{} for _ in texts]
+    ids = ids or [str(uuid.uuid4()) for _ in texts]
+    docstore = InMemoryDocstore({
+        doc_id: Document(page_content=text, metadata=metadata)
+        for doc_id, text, metadata in zip(ids, texts, metadatas)
+    })
+    return FAISS(embeddings, index, docstore, dict(enumerate(ids)))
 
 @st.cache_resource
 def initialize_vectorstore(_embeddings):
+    # An index on disk that fails to load is never overwritten by the sample
+    # templates below: ingest.py's manifest still lists its files.
+    existing = has_index(INDEX_DIR) or os.path.exists(os.path.join(INDEX_DIR, LEGACY_PICKLE_FILE))
     try:
-        vectorstore = FAISS.load_local(
-            folder_path="./faiss_index",
-            embeddings=_embeddings,
-            allow_dangerous_deserialization=True
-        )
+        if has_index(INDEX_DIR):
+            vectorstore = load_index(INDEX_DIR, _embeddings)
+        else:
+            # Legacy save_local() folder: unpickle once, then migrate to the mmap format
+            vectorstore = FAISS.load_local(
+                folder_path=INDEX_DIR,
+                embeddings=_embeddings,
+                allow_dangerous_deserialization=True
+            )
+            try:
+                save_index(vectorstore, INDEX_DIR)
+            except Exception as e:
+                st.warning(f"Could not migrate vector store: {e}")
+        configure_search(vectorstore.index)
         return vectorstore
-    except (FileNotFoundError, Exception):
+    except (FileNotFoundError, Exception) as e:
+        if existing:
+            st.warning(f"Could not load the vector store in {INDEX_DIR} ({e}); using the built-in sample "
+                       "templates for now. Run `python ingest.py <templates> --rebuild` to rebuild it.")
         sample_templates = [ 
             Document(
                 page_content="""
@@ -120,9 +221,16 @@ def initialize_vectorstore(_embeddings):
                 metadata={"job_field": "Finance"}
             )
         ]
-        vectorstore = FAISS.from_documents(sample_templates, _embeddings)
+        texts = [doc.page_content for doc in sample_templates]
+        vectorstore = build_vectorstore(
+            list(zip(texts, _embeddings.embed_documents(texts))),
+            _embeddings,
+            metadatas=[doc.metadata for doc in sample_templates],
+        )
+        if existing:
+            return vectorstore  # in memory only
         try:
-            vectorstore.save_local("./faiss_index")
+            save_index(vectorstore, INDEX_DIR)
         except Exception as e:
             st.warning(f"Could not save vector store: {e}")
         return vectorstore